@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de bout en bout des playbooks Aruba
+
+Ce script démarre une flotte de switches simulés (mock_aoscx_server.py), génère
+un inventaire pointant vers cette flotte puis exécute les playbooks du projet
+contre elle. Il mesure le temps total, le débit (switches/minute) et, par
+étape REST (login, facts, upload, boot, config), le nombre de requêtes, la
+latence moyenne et le volume transféré.
+
+Un fichier de résultats précédent peut servir de référence (--baseline): le
+script sort en erreur si un scénario est plus lent que la référence au-delà de
+la tolérance, ce qui permet de détecter les régressions avant la production.
+
+Usage:
+    python benchmarks/bench_playbooks.py --count 200 --scenario inventory firmware
+    python benchmarks/bench_playbooks.py --count 200 --baseline bench_baseline.json
+
+Auteur: Aruba Manager Team
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_aoscx_server import build_parser, fleet_from_args, write_inventory  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scénarios: playbook, variables supplémentaires, tags à ignorer (étapes hors
+# REST), étapes REST qui doivent recevoir des requêtes (un scénario qui
+# n'atteint pas la flotte simulée ne mesure rien et est signalé en erreur) et
+# collections Ansible requises
+SCENARIOS = {
+    'inventory': {
+        'playbook': 'collecte_inventaire.yml',
+        'extra_vars': {'repository_server': 'localhost', 'cleanup_temp_files': True},
+        'skip_tags': ['check', 'transfer'],
+        'expected_stages': ['facts'],
+        'collections': ['arubanetworks.aoscx'],
+    },
+    'firmware': {
+        'playbook': 'update_firmware.yml',
+        'extra_vars': {
+            'auto_select_firmware': False,
+            'backup_config': False,
+            'generate_report': False,
+            'post_reboot_wait': 1,
+            'max_reboot_time': 300,
+        },
+        # 'check' reste actif: il définit firmware_already_on_target et
+        # chosen_partition; seules les commandes SSH (network_cli) sont ignorées
+        'skip_tags': ['backup', 'cli'],
+        'expected_stages': ['facts', 'upload', 'boot'],
+        'collections': ['arubanetworks.aoscx'],
+    },
+    'ztp_config': {
+        'playbook': 'ztp_init_factory_switch.yml',
+        'extra_vars': {},
+        'tags': ['vlans', 'trunk'],
+        'expected_stages': ['config'],
+        'collections': ['arubanetworks.aoscx'],
+    },
+    # Appels REST du rôle firmware_updater: session partagée (aoscx_rest) ou
+    # login/logout à chaque tâche (comportement des modules de la collection)
+    'rest_session': {
+        'playbook': 'benchmarks/rest_session.yml',
+        'extra_vars': {'bench_rest_login_per_task': False},
+        'expected_stages': ['login', 'facts'],
+        'collections': [],
+    },
+    'rest_per_task': {
+        'playbook': 'benchmarks/rest_session.yml',
+        'extra_vars': {'bench_rest_login_per_task': True},
+        'expected_stages': ['login', 'facts'],
+        'collections': [],
+    },
+}
+
+# Variables VLAN nécessaires au rôle aoscx_ztp_config
+ZTP_VLAN_VARS = {
+    'pc_vlan': 10, 'pc_admin': 11, 'toip': 12, 'impr': 13, 'priv': 14,
+    'secu': 15, 'gtc': 16, 'rso': 17, 'adm_wifi': 18, 'wifi_perm': 19,
+}
+
+
+def missing_collections(ansible_playbook, required):
+    """Retourner les collections de `required` absentes pour l'ansible-playbook utilisé.
+
+    Sans elles un scénario échoue dès la première tâche et ne mesure rien.
+    """
+    galaxy = os.path.join(os.path.dirname(shutil.which(ansible_playbook)), 'ansible-galaxy')
+    if not os.path.exists(galaxy):
+        galaxy = 'ansible-galaxy'
+    # stdin/stdout bloquants: ansible-galaxy refuse de tourner sinon; ansible.cfg
+    # du projet lu comme lors de l'exécution des playbooks
+    process = subprocess.run([galaxy, 'collection', 'list', '--format', 'json'], cwd=PROJECT_ROOT,
+                             stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    if process.returncode != 0:
+        logger.warning(f"Impossible de lister les collections installées: {process.stderr.strip()}")
+        return []
+    installed = set()
+    for collections in json.loads(process.stdout or '{}').values():
+        installed.update(collections)
+    return [name for name in required if name not in installed]
+
+
+def generate_self_signed_cert(directory):
+    """Générer un certificat auto-signé avec openssl (HTTPS requis par pyaoscx)."""
+    certfile = os.path.join(directory, 'mock.crt')
+    keyfile = os.path.join(directory, 'mock.key')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=mock-aoscx', '-keyout', keyfile, '-out', certfile],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return certfile, keyfile
+
+
+def create_firmware_file(directory, size_mb, version='10_13_1110'):
+    """Créer un fichier firmware factice (creux) de la taille demandée."""
+    path = os.path.join(directory, f"ArubaOS-CX_6300_{version}.swi")
+    with open(path, 'wb') as f:
+        f.truncate(int(size_mb * 1024 * 1024))
+    return path
+
+
+def run_scenario(name, fleet, inventory_file, work_dir, args):
+    """Exécuter un scénario et retourner ses mesures."""
+    scenario = SCENARIOS[name]
+    extra_vars = dict(scenario['extra_vars'])
+    extra_vars.update(ZTP_VLAN_VARS)
+    # Cache de sessions REST propre au benchmark: pas de cookie d'une exécution précédente
+    extra_vars['bench_session_cache_dir'] = os.path.join(work_dir, 'sessions')
+    if name == 'firmware':
+        extra_vars['firmware_file_path'] = create_firmware_file(work_dir, args.firmware_size_mb)
+        extra_vars['target_firmware_version'] = \
+            f"{fleet.switches[0].state.version_prefix}.{args.upload_version}"
+
+    extra_vars_file = os.path.join(work_dir, f"{name}_vars.json")
+    with open(extra_vars_file, 'w') as f:
+        json.dump(extra_vars, f)
+
+    command = [
+        args.ansible_playbook, '-i', inventory_file,
+        os.path.join(PROJECT_ROOT, scenario['playbook']),
+        '-e', f"@{extra_vars_file}", '-f', str(args.forks),
+    ]
+    if scenario.get('tags'):
+        command += ['--tags', ','.join(scenario['tags'])]
+    if scenario.get('skip_tags'):
+        command += ['--skip-tags', ','.join(scenario['skip_tags'])]
+
+    log_file = os.path.join(work_dir, f"{name}.log")
+    fleet.stats.reset()
+    logger.info(f"Scénario {name}: {' '.join(command)}")
+
+    started = time.monotonic()
+    with open(log_file, 'w') as log:
+        process = subprocess.run(command, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT,
+                                 env=dict(os.environ, ANSIBLE_HOST_KEY_CHECKING='False'))
+    wall_clock = time.monotonic() - started
+
+    stats = fleet.stats.snapshot()
+    for stage in stats['stages'].values():
+        stage['mb_per_second'] = round(stage['bytes'] / (1024 * 1024) / wall_clock, 2) if wall_clock else 0
+
+    missing_stages = [stage for stage in scenario.get('expected_stages', [])
+                      if not stats['stages'].get(stage, {}).get('requests')]
+    if missing_stages:
+        logger.error(f"Scénario {name}: aucune requête REST pour les étapes {', '.join(missing_stages)}")
+
+    return {
+        'scenario': name,
+        'playbook': scenario['playbook'],
+        'switches': fleet.count,
+        'forks': args.forks,
+        'return_code': process.returncode,
+        'wall_clock_seconds': round(wall_clock, 2),
+        'switches_per_minute': round(fleet.count * 60 / wall_clock, 2) if wall_clock else 0,
+        'mock': stats,
+        'missing_stages': missing_stages,
+        'log_file': log_file,
+    }
+
+
+def print_results(results):
+    """Afficher un résumé texte des mesures."""
+    print("\n" + "=" * 72)
+    print("BENCHMARK DES PLAYBOOKS (flotte simulée)")
+    print("=" * 72)
+    for result in results:
+        print(f"\nScénario: {result['scenario']} ({result['playbook']}) - rc={result['return_code']}")
+        print(f"  Switches: {result['switches']}  Forks: {result['forks']}")
+        if result['missing_stages']:
+            print(f"  ATTENTION: aucune requête pour {', '.join(result['missing_stages'])}")
+        print(f"  Durée totale: {result['wall_clock_seconds']}s  Débit: {result['switches_per_minute']} switches/min")
+        print(f"  Sessions REST: {result['mock']['sessions_opened']} ouvertes, "
+              f"{result['mock']['sessions_closed']} fermées, {result['mock']['reboots']} redémarrages")
+        print(f"  {'Étape':<16}{'Requêtes':>10}{'Erreurs':>10}{'Moy. (ms)':>12}{'Mo/s':>10}")
+        for stage, entry in sorted(result['mock']['stages'].items()):
+            print(f"  {stage:<16}{entry['requests']:>10}{entry['errors']:>10}"
+                  f"{entry['avg_ms']:>12}{entry['mb_per_second']:>10}")
+    print("=" * 72)
+
+
+def compare_with_baseline(results, baseline_file, tolerance):
+    """Comparer aux résultats de référence; retourner la liste des régressions."""
+    with open(baseline_file, 'r') as f:
+        baseline = {entry['scenario']: entry for entry in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get(result['scenario'])
+        if not reference or reference['switches'] != result['switches']:
+            continue
+        limit = reference['wall_clock_seconds'] * (1 + tolerance)
+        if result['wall_clock_seconds'] > limit:
+            regressions.append(
+                f"{result['scenario']}: {result['wall_clock_seconds']}s > {limit:.2f}s "
+                f"(référence {reference['wall_clock_seconds']}s, tolérance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = build_parser()
+    parser.description = "Benchmark des playbooks contre une flotte AOS-CX simulée"
+    parser.set_defaults(count=100, reboot_time=5.0)
+    parser.add_argument('--scenario', nargs='+', choices=sorted(SCENARIOS), default=['inventory'],
+                        help='Scénarios à exécuter')
+    parser.add_argument('--forks', type=int, default=50, help='Nombre de forks Ansible')
+    parser.add_argument('--firmware-size-mb', type=float, default=50, help='Taille du firmware factice (Mo)')
+    parser.add_argument('--no-tls', action='store_true', help='Servir en HTTP simple')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='Exécutable ansible-playbook')
+    parser.add_argument('--output', help='Écrire les résultats au format JSON')
+    parser.add_argument('--baseline', help='Résultats JSON de référence pour détecter les régressions')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Dégradation tolérée (0.15 = 15%%)')
+    parser.add_argument('--keep', action='store_true', help='Conserver le répertoire de travail')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    if not shutil.which(args.ansible_playbook):
+        logger.error(f"Exécutable introuvable: {args.ansible_playbook}")
+        sys.exit(1)
+
+    required = sorted({name for scenario in args.scenario for name in SCENARIOS[scenario]['collections']})
+    missing = missing_collections(args.ansible_playbook, required) if required else []
+    if missing:
+        logger.error(f"Collections Ansible absentes: {', '.join(missing)} - installez-les avec "
+                     f"'ansible-galaxy collection install -r requirements.yml' avant le benchmark")
+        sys.exit(1)
+
+    if 'firmware' in args.scenario and not args.models:
+        # Un seul firmware pour toute la flotte: on simule un modèle unique
+        args.models = ['6300']
+
+    work_dir = tempfile.mkdtemp(prefix='aruba_bench_')
+    if not args.no_tls and not args.certfile:
+        args.certfile, args.keyfile = generate_self_signed_cert(work_dir)
+
+    fleet = fleet_from_args(args)
+    fleet.start()
+    inventory_file = os.path.join(work_dir, 'mock_fleet.yml')
+    write_inventory(fleet.inventory(), inventory_file)
+
+    results = []
+    try:
+        for name in args.scenario:
+            results.append(run_scenario(name, fleet, inventory_file, work_dir, args))
+    finally:
+        fleet.stop()
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'generated_at': datetime.now().isoformat(), 'results': results}, f, indent=2)
+        logger.info(f"Résultats écrits dans {args.output}")
+
+    exit_code = 0
+    if any(result['return_code'] != 0 or result['missing_stages'] for result in results):
+        logger.error(f"Au moins un playbook a échoué ou n'a pas atteint la flotte simulée, "
+                     f"voir les journaux dans {work_dir}")
+        args.keep = True
+        exit_code = 1
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            logger.error(f"RÉGRESSION {regression}")
+        if regressions:
+            exit_code = 1
+
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
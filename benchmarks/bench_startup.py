@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark du temps de démarrage des modules et scripts Aruba
+
+Les modules Ansible sont relancés dans un nouvel interpréteur pour chaque
+switch et chaque tâche: sur une flotte de plusieurs milliers de switches, le
+coût des imports domine les invocations courtes (paramètres invalides,
+dépendance absente, fichier introuvable). Ce script mesure ces invocations
+(nouvel interpréteur à chaque exécution, comme en production) et, avec
+--importtime, liste les imports les plus coûteux de chaque scénario
+(python -X importtime).
+
+Les modules sont exécutés comme par AnsiballZ: arguments passés en JSON,
+module_utils du projet ajoutés à ansible.module_utils.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 20 --importtime
+    python benchmarks/bench_startup.py --output startup_baseline.json
+    python benchmarks/bench_startup.py --baseline startup_baseline.json --tolerance 0.2
+
+Auteur: Aruba Manager Team
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES_DIR = os.path.join(PROJECT_ROOT, 'plugins', 'modules')
+MODULE_UTILS_DIR = os.path.join(PROJECT_ROOT, 'plugins', 'module_utils')
+
+# Lance un module comme AnsiballZ: module_utils du projet visibles sous
+# ansible.module_utils, arguments JSON en premier argument
+MODULE_RUNNER = (
+    "import sys, runpy, ansible.module_utils; "
+    "ansible.module_utils.__path__.append(sys.argv[1]); "
+    "path = sys.argv[2]; sys.argv = [path, sys.argv[3]]; "
+    "runpy.run_path(path, run_name='__main__')"
+)
+
+# Scénarios: commande (après l'interpréteur) et code retour attendu, pour ne
+# pas mesurer par erreur un script qui plante à l'import
+SCENARIOS = {
+    'python': {
+        'description': "Interpréteur seul (plancher)",
+        'command': ['-c', 'pass'],
+        'return_code': 0,
+    },
+    'module_utils_basic': {
+        'description': "Import de ansible.module_utils.basic (plancher des modules)",
+        'command': ['-c', 'import ansible.module_utils.basic'],
+        'return_code': 0,
+    },
+    'ztp_auth_fail': {
+        'description': "aoscx_ztp_auth, paramètres manquants",
+        'module': 'aoscx_ztp_auth.py',
+        'args': {},
+        'return_code': 1,
+    },
+    'ztp_bulk_auth_fail': {
+        'description': "aoscx_ztp_bulk_auth, mot de passe absent",
+        'module': 'aoscx_ztp_bulk_auth.py',
+        'args': {'switches': [{'hostname': '192.0.2.1'}]},
+        'return_code': 1,
+    },
+    'exporter_usage': {
+        'description': "inventory_exporter.py sans argument",
+        'script': 'roles/inventory_collector/files/inventory_exporter.py',
+        'script_args': [],
+        'return_code': 1,
+    },
+    'exporter_missing_input': {
+        'description': "inventory_exporter.py, fichier JSON introuvable",
+        'script': 'roles/inventory_collector/files/inventory_exporter.py',
+        'script_args': ['{work_dir}/absent.json', '{work_dir}/absent.xlsx'],
+        'return_code': 1,
+    },
+    'exporter_export': {
+        'description': "inventory_exporter.py, export de 200 switches",
+        'script': 'roles/inventory_collector/files/inventory_exporter.py',
+        'script_args': ['{work_dir}/inventory.json', '{work_dir}/inventory.xlsx'],
+        'return_code': 0,
+    },
+    'validator_missing_file': {
+        'description': "firware_validator.py --checksum-only, fichier introuvable",
+        'script': 'roles/firmware_updater/files/firware_validator.py',
+        'script_args': ['{work_dir}/absent.swi', '--checksum-only'],
+        'return_code': 1,
+    },
+}
+
+
+def create_inventory_file(directory, count=200):
+    """Générer un fichier d'inventaire JSON factice pour le scénario d'export."""
+    devices = [{
+        'nom_switch': f'SW-BENCH-{index:04d}',
+        'modele': 'ÉCHEC DE COLLECTE' if index % 25 == 0 else 'JL659A 6300M 48SR5 CL6 PoE 4SFP56 Swch',
+        'serial': f'SG{index:08d}',
+        'version_os': 'FL.10.13.1110',
+        'date_collecte': '2026-01-01 00:00:00',
+        'adresse_ip': f'10.0.{index // 250}.{index % 250 + 1}',
+    } for index in range(count)]
+    with open(os.path.join(directory, 'inventory.json'), 'w') as f:
+        json.dump(devices, f)
+
+
+def scenario_command(scenario, python, work_dir, importtime=False):
+    """Construire la ligne de commande d'un scénario."""
+    command = [python] + (['-X', 'importtime'] if importtime else [])
+    if 'module' in scenario:
+        return command + ['-c', MODULE_RUNNER, MODULE_UTILS_DIR, os.path.join(MODULES_DIR, scenario['module']),
+                          json.dumps({'ANSIBLE_MODULE_ARGS': scenario['args']})]
+    if 'script' in scenario:
+        return command + [os.path.join(PROJECT_ROOT, scenario['script'])] + \
+            [arg.format(work_dir=work_dir) for arg in scenario['script_args']]
+    return command + scenario['command']
+
+
+def top_imports(stderr, limit):
+    """Extraire les imports de premier niveau les plus coûteux de la sortie -X importtime."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # Les imports imbriqués sont indentés de deux espaces par niveau
+        if not name[1:].startswith(' '):
+            imports.append((int(cumulative_us), name.strip()))
+    imports.sort(reverse=True)
+    return [{'module': name, 'ms': round(us / 1000.0, 1)} for us, name in imports[:limit]]
+
+
+def run_scenario(name, python, work_dir, runs, importtime, limit):
+    """Exécuter un scénario `runs` fois et mesurer la durée de chaque exécution."""
+    scenario = SCENARIOS[name]
+    command = scenario_command(scenario, python, work_dir)
+    durations = []
+    return_code = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run(command, cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        durations.append((time.perf_counter() - started) * 1000)
+        return_code = completed.returncode
+
+    result = {
+        'scenario': name,
+        'description': scenario['description'],
+        'runs': runs,
+        'return_code': return_code,
+        'expected_return_code': scenario['return_code'],
+        'median_ms': round(statistics.median(durations), 1),
+        'min_ms': round(min(durations), 1),
+        'max_ms': round(max(durations), 1),
+    }
+    if return_code != scenario['return_code']:
+        result['error'] = (completed.stderr or completed.stdout).strip().splitlines()[-1:] or ['']
+
+    if importtime:
+        traced = subprocess.run(scenario_command(scenario, python, work_dir, importtime=True), cwd=work_dir,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        result['top_imports'] = top_imports(traced.stderr, limit)
+    return result
+
+
+def print_results(results):
+    """Afficher un résumé texte des mesures."""
+    print("\n" + "=" * 72)
+    print("BENCHMARK DU DÉMARRAGE (nouvel interpréteur à chaque exécution)")
+    print("=" * 72)
+    print(f"{'Scénario':<26}{'Médiane (ms)':>14}{'Min (ms)':>10}{'Max (ms)':>10}{'rc':>5}")
+    for result in results:
+        print(f"{result['scenario']:<26}{result['median_ms']:>14}{result['min_ms']:>10}"
+              f"{result['max_ms']:>10}{result['return_code']:>5}")
+        for entry in result.get('top_imports', []):
+            print(f"    {entry['ms']:>8} ms  {entry['module']}")
+        if 'error' in result:
+            print(f"    code retour inattendu (attendu {result['expected_return_code']}): {result['error'][0]}")
+    print("=" * 72)
+
+
+def compare_with_baseline(results, baseline_file, tolerance):
+    """Comparer aux résultats de référence; retourner la liste des régressions."""
+    with open(baseline_file, 'r') as f:
+        baseline = {entry['scenario']: entry for entry in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get(result['scenario'])
+        if not reference:
+            continue
+        limit = reference['median_ms'] * (1 + tolerance)
+        if result['median_ms'] > limit:
+            regressions.append(
+                f"{result['scenario']}: {result['median_ms']}ms > {limit:.1f}ms "
+                f"(référence {reference['median_ms']}ms, tolérance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Benchmark du temps de démarrage des modules et scripts")
+    parser.add_argument('--scenario', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='Scénarios à exécuter')
+    parser.add_argument('--runs', type=int, default=10, help='Exécutions par scénario')
+    parser.add_argument('--python', default=sys.executable, help='Interpréteur utilisé par les modules')
+    parser.add_argument('--importtime', action='store_true', help='Lister les imports les plus coûteux')
+    parser.add_argument('--top', type=int, default=5, help='Nombre d\'imports listés par scénario')
+    parser.add_argument('--output', help='Écrire les résultats au format JSON')
+    parser.add_argument('--baseline', help='Résultats JSON de référence pour détecter les régressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Dégradation tolérée (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    work_dir = tempfile.mkdtemp(prefix='aruba_startup_')
+    create_inventory_file(work_dir)
+    try:
+        results = [run_scenario(name, args.python, work_dir, args.runs, args.importtime, args.top)
+                   for name in args.scenario]
+    finally:
+        for entry in os.listdir(work_dir):
+            os.remove(os.path.join(work_dir, entry))
+        os.rmdir(work_dir)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'generated_at': datetime.now().isoformat(), 'python': args.python, 'results': results},
+                      f, indent=2)
+        logger.info(f"Résultats écrits dans {args.output}")
+
+    exit_code = 0
+    if any('error' in result for result in results):
+        logger.error("Au moins un scénario n'a pas rendu le code retour attendu")
+        exit_code = 1
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            logger.error(f"RÉGRESSION {regression}")
+        if regressions:
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
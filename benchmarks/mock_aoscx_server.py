@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mock AOS-CX REST API
+
+Ce script simule une flotte de switches Aruba AOS-CX exposant les endpoints REST
+utilisés par les rôles du projet (inventory_collector, firmware_updater,
+aoscx_ztp_config). Il permet de tester et de mesurer les playbooks sans
+laboratoire physique.
+
+Endpoints simulés (quel que soit le préfixe /rest/vX.YY/):
+    POST   login, logout
+    GET    system, system/subsystems, firmware, firmware/status
+    POST   firmware?image=primary|secondary   (upload local multipart)
+    PUT    firmware?image=...&from=URL        (upload distant)
+    POST   boot?image=primary|secondary       (redémarrage simulé)
+    GET/POST/PUT/PATCH/DELETE system/vlans[/<id>], system/interfaces[/<nom>]
+    GET    /mock/stats                        (statistiques, sans authentification)
+
+Usage:
+    python mock_aoscx_server.py --count 200 --base-port 20000 \\
+        --latency 0.05 --bandwidth 20M --reboot-time 30 \\
+        --inventory-out inventory/mock_fleet.yml
+
+Auteur: Aruba Manager Team
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import ssl
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+API_VERSION = "v10.09"
+READ_CHUNK_SIZE = 256 * 1024
+# Début du corps conservé pour un upload firmware (en-tête multipart avec le
+# nom du fichier): le reste de l'image est lu puis jeté
+FIRMWARE_HEAD_SIZE = 4096
+REST_PREFIX_RE = re.compile(r'^/rest/v[^/]+/?')
+FIRMWARE_FILENAME_RE = re.compile(r'filename="[^"]*?(\d{2})_(\d{2})_(\d{4})[^"]*"')
+
+# Modèles simulés: (numéro de modèle, préfixe de version, nom produit)
+SIMULATED_MODELS = [
+    ('6100', 'PL', 'JL679A 6100 24G 4SFP+ Switch'),
+    ('6200', 'ML', 'JL724A 6200F 24G 4SFP+ Switch'),
+    ('6300', 'FL', 'JL667A 6300F 48G 4SFP56 Switch'),
+    ('6400', 'FL', 'R0X26A 6405 Switch'),
+    ('8320', 'TL', 'JL479A 8320 Switch'),
+    ('8325', 'GL', 'JL627A 8325-32C Switch'),
+]
+
+
+def parse_bandwidth(value):
+    """Convertir une bande passante texte (ex: '20M', '512K') en octets/s."""
+    if value in (None, '', '0'):
+        return 0
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    value = str(value).strip().upper().rstrip('B')
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(float(value))
+
+
+def stage_for_request(method, resource):
+    """Classer une requête REST dans une étape fonctionnelle pour les statistiques."""
+    if resource in ('login', 'logout'):
+        return resource
+    if resource.startswith('firmware'):
+        return 'upload' if method in ('POST', 'PUT') else 'firmware_facts'
+    if resource.startswith('boot'):
+        return 'boot'
+    if resource.startswith('system/vlans') or resource.startswith('system/interfaces'):
+        return 'config' if method != 'GET' else 'facts'
+    if method == 'GET':
+        return 'facts'
+    return 'config'
+
+
+class FleetStats:
+    """Statistiques agrégées (thread-safe) sur l'ensemble de la flotte simulée."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.stages = defaultdict(lambda: {'requests': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0})
+        self.sessions_opened = 0
+        self.sessions_closed = 0
+        self.reboots = 0
+
+    def record(self, stage, seconds, nbytes=0, error=False):
+        """Enregistrer une requête traitée."""
+        with self._lock:
+            entry = self.stages[stage]
+            entry['requests'] += 1
+            entry['seconds'] += seconds
+            entry['bytes'] += nbytes
+            if error:
+                entry['errors'] += 1
+
+    def incr(self, counter):
+        """Incrémenter un compteur simple (sessions, reboots)."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def reset(self):
+        """Remettre les statistiques à zéro (entre deux scénarios de benchmark)."""
+        with self._lock:
+            self.started_at = time.time()
+            self.stages.clear()
+            self.sessions_opened = 0
+            self.sessions_closed = 0
+            self.reboots = 0
+
+    def snapshot(self):
+        """Retourner une copie sérialisable des statistiques."""
+        with self._lock:
+            stages = {}
+            for name, entry in self.stages.items():
+                stages[name] = dict(entry)
+                stages[name]['avg_ms'] = round(1000 * entry['seconds'] / entry['requests'], 2) if entry['requests'] else 0
+            return {
+                'elapsed_seconds': round(time.time() - self.started_at, 3),
+                'sessions_opened': self.sessions_opened,
+                'sessions_closed': self.sessions_closed,
+                'reboots': self.reboots,
+                'stages': stages,
+            }
+
+
+class SwitchState:
+    """État interne d'un switch simulé."""
+
+    def __init__(self, index, model, version_prefix, product_name, running_version):
+        self.index = index
+        self.model = model
+        self.hostname = f"mock-{model}-{index:04d}"
+        self.platform_name = model
+        self.product_name = product_name
+        self.serial = f"SG{model}{index:06d}"
+        self.version_prefix = version_prefix
+        self.primary_version = f"{version_prefix}.{running_version}"
+        self.secondary_version = f"{version_prefix}.{running_version}"
+        self.current_version = self.primary_version
+        self.default_image = 'primary'
+        self.booted_image = 'primary'
+        self.firmware_status = {'status': 'none', 'reason': '', 'date': 0}
+        self.sessions = set()
+        self.vlans = {'1': {'id': 1, 'name': 'DEFAULT_VLAN_1', 'description': None}}
+        self.interfaces = {
+            f"1/1/{port}": {'name': f"1/1/{port}", 'description': None, 'vlan_mode': 'access'}
+            for port in range(1, 53)
+        }
+        self.lock = threading.RLock()
+
+    def system(self):
+        """Représentation de la ressource /system."""
+        return {
+            'hostname': self.hostname,
+            'platform_name': self.platform_name,
+            'software_version': self.current_version,
+            'software_images': {
+                'primary_image_version': self.primary_version,
+                'secondary_image_version': self.secondary_version,
+                'default_image': self.default_image,
+                'booted_image': self.booted_image,
+            },
+            'mgmt_intf_status': {'hostname': self.hostname},
+        }
+
+    def subsystems(self):
+        """Représentation de la ressource /system/subsystems (product_info)."""
+        return {
+            'chassis,1': {
+                'product_info': {
+                    'product_name': self.product_name,
+                    'serial_number': self.serial,
+                    'part_number': self.product_name.split(' ')[0],
+                    'product_description': self.product_name,
+                },
+            },
+        }
+
+    def firmware(self):
+        """Représentation de la ressource /firmware."""
+        return {
+            'current_version': self.current_version,
+            'primary_version': self.primary_version,
+            'secondary_version': self.secondary_version,
+            'default_image': self.default_image,
+            'booted_image': self.booted_image,
+        }
+
+
+class MockSwitch:
+    """Un switch simulé: un serveur HTTP(S) dédié sur (adresse, port)."""
+
+    def __init__(self, state, address, port, fleet):
+        self.state = state
+        self.address = address
+        self.port = port
+        self.fleet = fleet
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Démarrer l'écoute (appelé aussi à la fin d'un redémarrage simulé)."""
+        handler = type('BoundHandler', (MockAoscxHandler,), {'switch': self})
+        server = ThreadingHTTPServer((self.address, self.port), handler)
+        server.daemon_threads = True
+        if self.fleet.ssl_context is not None:
+            server.socket = self.fleet.ssl_context.wrap_socket(server.socket, server_side=True)
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, name=f"mock-{self.port}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrêter l'écoute et libérer le port."""
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    def reboot(self, image):
+        """Simuler un redémarrage: port fermé pendant reboot_time puis nouvelle version active."""
+        def _cycle():
+            time.sleep(0.5)
+            self.stop()
+            time.sleep(self.fleet.reboot_time)
+            with self.state.lock:
+                self.state.booted_image = image
+                self.state.default_image = image
+                self.state.current_version = (self.state.primary_version if image == 'primary'
+                                              else self.state.secondary_version)
+                self.state.sessions.clear()
+            self.start()
+            logger.info(f"{self.state.hostname} redémarré sur {image} ({self.state.current_version})")
+
+        self.fleet.stats.incr('reboots')
+        threading.Thread(target=_cycle, name=f"reboot-{self.port}", daemon=True).start()
+
+
+class MockAoscxHandler(BaseHTTPRequestHandler):
+    """Gestionnaire HTTP imitant l'API REST AOS-CX."""
+
+    protocol_version = 'HTTP/1.1'
+    switch = None  # Injecté par MockSwitch.start()
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.switch.state.hostname, format % args)
+
+    # ------------------------------------------------------------------ utilitaires
+
+    def _send_json(self, status, payload=None, headers=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        return status
+
+    def _read_body(self, keep=None):
+        """Lire le corps de la requête en respectant la bande passante simulée.
+
+        Seuls les `keep` premiers octets sont conservés (tout le corps si None):
+        une image firmware est lue bloc par bloc puis jetée, pour que la mémoire
+        du mock ne croisse pas avec le nombre d'uploads simultanés.
+
+        :return: (octets conservés, nombre d'octets lus), ou (None, octets lus)
+            si le client est parti avant la fin.
+        """
+        length = int(self.headers.get('Content-Length') or 0)
+        bandwidth = self.switch.fleet.bandwidth
+        data = bytearray()
+        received = 0
+        started = time.monotonic()
+        while received < length:
+            chunk = self.rfile.read(min(READ_CHUNK_SIZE, length - received))
+            if not chunk:
+                break
+            received += len(chunk)
+            if keep is None or len(data) < keep:
+                data.extend(chunk if keep is None else chunk[:keep - len(data)])
+            if bandwidth:
+                expected = received / bandwidth
+                elapsed = time.monotonic() - started
+                if expected > elapsed:
+                    time.sleep(expected - elapsed)
+        if received < length:
+            # Client parti avant la fin (ex: upload interrompu), rien n'est appliqué
+            return None, received
+        return bytes(data), received
+
+    def _session_id(self):
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            key, _, value = part.strip().partition('=')
+            if key == 'id':
+                return value
+        return None
+
+    def _authenticated(self):
+        session_id = self._session_id()
+        if session_id and session_id in self.switch.state.sessions:
+            return True
+        # Authentification basique acceptée (utilisée par le module uri des prérequis)
+        return (self.headers.get('Authorization') or '').startswith('Basic ')
+
+    # ------------------------------------------------------------------ dispatch
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method):
+        started = time.monotonic()
+        fleet = self.switch.fleet
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/mock/stats':
+            self._send_json(200, fleet.stats.snapshot())
+            return
+        if url.path.rstrip('/') == '/rest':
+            prefix = f"/rest/{API_VERSION}"
+            self._send_json(200, {'latest': {'version': API_VERSION, 'prefix': prefix, 'deprecated': False}})
+            return
+
+        resource = unquote(REST_PREFIX_RE.sub('', url.path)).strip('/')
+        stage = stage_for_request(method, resource)
+        body, nbytes = b'', 0
+        if method in ('POST', 'PUT', 'PATCH'):
+            body, nbytes = self._read_body(keep=FIRMWARE_HEAD_SIZE if resource == 'firmware' else None)
+        if body is None:
+            fleet.stats.record(stage, time.monotonic() - started, nbytes, error=True)
+            self.close_connection = True
+            return
+
+        if fleet.latency:
+            time.sleep(fleet.latency + random.uniform(0, fleet.jitter))
+
+        try:
+            status = self._route(method, resource, query, body)
+        except Exception as e:  # Ne jamais tuer le thread serveur
+            logger.error(f"{self.switch.state.hostname}: erreur sur {method} {resource}: {str(e)}")
+            status = self._send_json(500, {'message': str(e)})
+        fleet.stats.record(stage, time.monotonic() - started, nbytes, error=status >= 400)
+
+    def _route(self, method, resource, query, body):
+        state = self.switch.state
+        stats = self.switch.fleet.stats
+
+        if resource == 'login' and method == 'POST':
+            params = {key: values[-1] for key, values in parse_qs(body.decode('utf-8', 'ignore')).items()}
+            params.update(query)
+            if params.get('username') != self.switch.fleet.username or \
+                    params.get('password') != self.switch.fleet.password:
+                return self._send_json(401, {'message': 'Login failed'})
+            with state.lock:
+                if len(state.sessions) >= self.switch.fleet.max_sessions:
+                    return self._send_json(401, {'message': 'session limit reached'})
+                session_id = secrets.token_hex(16)
+                state.sessions.add(session_id)
+            stats.incr('sessions_opened')
+            cookie = f"id={session_id}; Path=/; HttpOnly"
+            if self.switch.fleet.ssl_context is not None:
+                cookie += "; Secure"
+            return self._send_json(200, headers={'Set-Cookie': cookie})
+
+        if resource == 'logout' and method == 'POST':
+            with state.lock:
+                state.sessions.discard(self._session_id())
+            stats.incr('sessions_closed')
+            return self._send_json(200)
+
+        if not self._authenticated():
+            return self._send_json(401, {'message': 'Unauthorized'})
+
+        with state.lock:
+            if resource == 'system' and method == 'GET':
+                return self._send_json(200, state.system())
+            if resource == 'system/subsystems' and method == 'GET':
+                return self._send_json(200, state.subsystems())
+            if resource == 'firmware' and method == 'GET':
+                return self._send_json(200, state.firmware())
+            if resource == 'firmware/status' and method == 'GET':
+                return self._send_json(200, state.firmware_status)
+            if resource == 'firmware' and method in ('POST', 'PUT'):
+                return self._upload_firmware(query, body)
+            if resource == 'boot' and method == 'POST':
+                image = query.get('image', state.default_image)
+                if image not in ('primary', 'secondary'):
+                    return self._send_json(400, {'message': f"Invalid image {image}"})
+                self.switch.reboot(image)
+                return self._send_json(200)
+            if resource.startswith('system/vlans'):
+                return self._collection(state.vlans, 'system/vlans', resource, method, body, key_field='id')
+            if resource.startswith('system/interfaces'):
+                return self._collection(state.interfaces, 'system/interfaces', resource, method, body,
+                                        key_field='name')
+            if method == 'GET':
+                return self._send_json(404, {'message': f"Unknown resource {resource}"})
+            # Autres écritures de configuration: acceptées sans effet
+            return self._send_json(200)
+
+    def _upload_firmware(self, query, body):
+        state = self.switch.state
+        image = query.get('image')
+        if image not in ('primary', 'secondary'):
+            return self._send_json(400, {'message': f"Invalid image {image}"})
+
+        version = self.switch.fleet.upload_version
+        match = FIRMWARE_FILENAME_RE.search(body[:FIRMWARE_HEAD_SIZE].decode('utf-8', 'ignore'))
+        if match:
+            version = f"{match.group(1)}.{match.group(2)}.{match.group(3)}"
+        if 'from' in query:
+            match = re.search(r'(\d{2})_(\d{2})_(\d{4})', query['from'])
+            if match:
+                version = f"{match.group(1)}.{match.group(2)}.{match.group(3)}"
+        full_version = f"{state.version_prefix}.{version}"
+
+        if image == 'primary':
+            state.primary_version = full_version
+        else:
+            state.secondary_version = full_version
+        state.firmware_status = {'status': 'success', 'reason': '', 'date': int(time.time())}
+        return self._send_json(200)
+
+    def _collection(self, items, base, resource, method, body, key_field):
+        key = resource[len(base):].strip('/')
+        payload = json.loads(body or b'{}') if body else {}
+        if not key:
+            if method == 'GET':
+                return self._send_json(200, {k: f"/rest/{API_VERSION}/{base}/{k}" for k in items})
+            if method == 'POST':
+                new_key = str(payload.get(key_field, ''))
+                if not new_key:
+                    return self._send_json(400, {'message': f"Missing {key_field}"})
+                if new_key in items:
+                    return self._send_json(400, {'message': f"{new_key} already exists"})
+                items[new_key] = payload
+                return self._send_json(201)
+            return self._send_json(405, {'message': 'Method not allowed'})
+        if method == 'GET':
+            if key not in items:
+                return self._send_json(404, {'message': f"{key} not found"})
+            return self._send_json(200, items[key])
+        if method == 'DELETE':
+            items.pop(key, None)
+            return self._send_json(204)
+        if method == 'PUT':
+            items[key] = payload
+        else:
+            items.setdefault(key, {}).update(payload)
+        return self._send_json(200)
+
+
+class MockFleet:
+    """Ensemble de switches simulés partageant configuration et statistiques."""
+
+    def __init__(self, count, base_port=20000, address='127.0.0.1', addressing='ports',
+                 latency=0.0, jitter=0.0, bandwidth=0, reboot_time=30.0,
+                 username='admin', password='admin', max_sessions=48,
+                 running_version='10.10.1040', upload_version='10.13.1110',
+                 models=None, certfile=None, keyfile=None):
+        self.count = count
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.reboot_time = reboot_time
+        self.username = username
+        self.password = password
+        self.max_sessions = max_sessions
+        self.upload_version = upload_version
+        self.stats = FleetStats()
+        self.ssl_context = None
+        if certfile:
+            self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.ssl_context.load_cert_chain(certfile, keyfile)
+
+        catalog = [entry for entry in SIMULATED_MODELS if not models or entry[0] in models]
+        if not catalog:
+            raise ValueError(f"Aucun modèle simulé parmi {models}")
+
+        self.switches = []
+        for index in range(count):
+            model, prefix, product = catalog[index % len(catalog)]
+            state = SwitchState(index + 1, model, prefix, product, running_version)
+            if addressing == 'loopback':
+                # Une adresse 127.1.x.y par switch, même port pour tous
+                switch_address = f"127.1.{index // 250}.{index % 250 + 1}"
+                port = base_port
+            else:
+                switch_address = address
+                port = base_port + index
+            self.switches.append(MockSwitch(state, switch_address, port, self))
+
+    def start(self):
+        """Démarrer tous les switches simulés."""
+        for switch in self.switches:
+            switch.start()
+        logger.info(f"{self.count} switches simulés démarrés "
+                    f"({'HTTPS' if self.ssl_context else 'HTTP'}, latence {self.latency}s, "
+                    f"bande passante {self.bandwidth or 'illimitée'} o/s)")
+
+    def stop(self):
+        """Arrêter tous les switches simulés."""
+        for switch in self.switches:
+            switch.stop()
+
+    def inventory(self, groups=('switches_aruba', 'switches_aruba_test'), extra_vars=None):
+        """Construire un inventaire Ansible (dict) pointant vers la flotte simulée."""
+        hosts = {}
+        for switch in self.switches:
+            hosts[switch.state.hostname] = {
+                'ansible_host': switch.address,
+                'ansible_port': switch.port,
+                'ansible_httpapi_port': switch.port,
+            }
+        group_vars = {
+            'ansible_connection': 'arubanetworks.aoscx.aoscx',
+            'ansible_network_os': 'arubanetworks.aoscx.aoscx',
+            'ansible_user': self.username,
+            'ansible_password': self.password,
+            'ansible_httpapi_use_ssl': self.ssl_context is not None,
+            'ansible_httpapi_validate_certs': False,
+            'ansible_aoscx_validate_certs': False,
+            'ansible_aoscx_use_proxy': False,
+            'ansible_acx_no_proxy': True,
+        }
+        group_vars.update(extra_vars or {})
+        inventory = {'mock_fleet': {'hosts': hosts, 'vars': group_vars}}
+        for group in groups:
+            inventory[group] = {'children': {'mock_fleet': None}}
+        return inventory
+
+
+def write_inventory(inventory, path):
+    """Écrire l'inventaire au format JSON (sous-ensemble valide de YAML)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(inventory, f, indent=2)
+    logger.info(f"Inventaire de la flotte simulée écrit dans {path}")
+
+
+def build_parser():
+    """Construire le parseur d'arguments partagé avec le benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Serveur REST simulant une flotte de switches Aruba AOS-CX",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--count', type=int, default=10, help='Nombre de switches simulés')
+    parser.add_argument('--base-port', type=int, default=20000, help='Premier port TCP utilisé')
+    parser.add_argument('--address', default='127.0.0.1', help="Adresse d'écoute (mode ports)")
+    parser.add_argument('--addressing', choices=['ports', 'loopback'], default='ports',
+                        help="'ports': un port par switch; 'loopback': une adresse 127.1.x.y par switch")
+    parser.add_argument('--latency', type=float, default=0.0, help='Latence ajoutée par requête (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Variation aléatoire de latence (s)')
+    parser.add_argument('--bandwidth', default='0', help="Débit max d'upload par switch (ex: 20M, 0 = illimité)")
+    parser.add_argument('--reboot-time', type=float, default=30.0, help='Durée du redémarrage simulé (s)')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--max-sessions', type=int, default=48, help='Sessions REST simultanées max par switch')
+    parser.add_argument('--running-version', default='10.10.1040', help='Version initiale (sans préfixe)')
+    parser.add_argument('--upload-version', default='10.13.1110',
+                        help="Version installée par un upload dont le nom de fichier n'est pas reconnu")
+    parser.add_argument('--models', nargs='+', choices=[entry[0] for entry in SIMULATED_MODELS],
+                        help='Modèles simulés (par défaut: tous, en alternance)')
+    parser.add_argument('--certfile', help='Certificat TLS (active HTTPS)')
+    parser.add_argument('--keyfile', help='Clé privée TLS')
+    parser.add_argument('--verbose', action='store_true', help='Journaliser chaque requête')
+    return parser
+
+
+def fleet_from_args(args):
+    """Instancier une MockFleet depuis les arguments de build_parser()."""
+    return MockFleet(
+        count=args.count, base_port=args.base_port, address=args.address, addressing=args.addressing,
+        latency=args.latency, jitter=args.jitter, bandwidth=parse_bandwidth(args.bandwidth),
+        reboot_time=args.reboot_time, username=args.username, password=args.password,
+        max_sessions=args.max_sessions, running_version=args.running_version,
+        upload_version=args.upload_version, models=args.models, certfile=args.certfile, keyfile=args.keyfile,
+    )
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = build_parser()
+    parser.add_argument('--inventory-out', help="Écrire un inventaire Ansible pointant vers la flotte")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    fleet = fleet_from_args(args)
+    fleet.start()
+    if args.inventory_out:
+        write_inventory(fleet.inventory(), args.inventory_out)
+
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Statistiques: {json.dumps(fleet.stats.snapshot())}")
+    except KeyboardInterrupt:
+        logger.info("Arrêt de la flotte simulée")
+    finally:
+        fleet.stop()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: progress_events
+type: notification
+short_description: Structured, real-time progress events for long fleet operations
+description:
+  - Streams one JSON event per line to a JSONL file or a Unix datagram socket while the playbook runs.
+  - Stages are taken from the C((stage)) prefix of the task names; a C(stage_start) event is sent when a
+    host enters a stage and a C(stage_end) event, with its duration, when it leaves it.
+  - A task declaring C(progress_event) in its C(vars) sends a milestone event of that name
+    (C(upload_done), C(reboot_down), C(reboot_up), C(verify_result), C(host_done)...) with the timing
+    fields of its result and, for C(set_fact), the facts it set.
+  - The resolved target is exported in C(ARUBA_PROGRESS_EVENTS) so modules running on the controller
+    (C(aoscx_upload_firmware_stream)) add their own live events, such as bytes uploaded, to the same stream.
+  - Follow the stream with C(scripts/aruba_progress.py).
+version_added: "1.0.0"
+requirements:
+  - Enable it with C(callbacks_enabled = progress_events) in ansible.cfg or
+    C(ANSIBLE_CALLBACKS_ENABLED=progress_events)
+options:
+  target:
+    description:
+      - JSONL file the events are appended to, or C(unix:<path>) to send them to the datagram
+        socket of a running viewer (events are dropped while no viewer listens).
+    type: str
+    default: ./progress/events.jsonl
+    env:
+      - name: ARUBA_PROGRESS_EVENTS
+    ini:
+      - section: callback_progress_events
+        key: target
+  container_stages:
+    description:
+      - Stages whose tasks only wrap other stages (C(include_tasks), reports); they close the
+        current stage of the host without opening a new one.
+    type: list
+    elements: str
+    default: [main, pipeline]
+    ini:
+      - section: callback_progress_events
+        key: container_stages
+"""
+
+import json
+import os
+import re
+import socket
+import time
+import uuid
+
+from ansible.plugins.callback import CallbackBase
+
+# Same variable and socket prefix as plugins/module_utils/aoscx_progress.py
+PROGRESS_ENV = 'ARUBA_PROGRESS_EVENTS'
+SOCKET_PREFIX = 'unix:'
+STAGE_RE = re.compile(r'^\((\w+)\)')
+# Result fields copied into milestone events
+MILESTONE_FIELDS = ('elapsed', 'size', 'duration', 'throughput_mbps', 'checksum', 'msg')
+
+
+def task_stage(task):
+    """Returns the stage of a task from its '(stage) ...' name, or `None`.
+
+    :param task: The task object.
+    :return: Stage name as a string, or `None` if the name has no stage prefix.
+    """
+    match = STAGE_RE.match(task.get_name().strip())
+    return match.group(1) if match else None
+
+
+class CallbackModule(CallbackBase):
+    """Emits stage transitions and milestones of every host as JSON events."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'notification'
+    CALLBACK_NAME = 'progress_events'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._target = None
+        self._file = None
+        self._socket = None
+        self._stages = {}
+        self._run_id = uuid.uuid4().hex[:12]
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self._container_stages = set(self.get_option('container_stages') or [])
+        target = self.get_option('target')
+        if not target or self._target is not None:
+            return
+        try:
+            if target.startswith(SOCKET_PREFIX):
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            else:
+                target = os.path.abspath(os.path.expanduser(target))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                self._file = open(target, 'a')
+        except (IOError, OSError) as e:
+            self._display.warning("progress_events: unable to open {0}: {1}".format(target, e))
+            return
+        self._target = target
+        # Inherited by the modules run on the controller (delegate_to: localhost)
+        os.environ[PROGRESS_ENV] = target
+
+    # ------------------------------------------------------------------ playbook events
+
+    def v2_playbook_on_start(self, playbook):
+        self._emit('run_start', run_id=self._run_id, pid=os.getpid(),
+                   playbook=os.path.basename(playbook._file_name))
+
+    def v2_playbook_on_play_start(self, play):
+        self._close_stages()
+        try:
+            hosts = play.get_variable_manager()._inventory.get_hosts(play.hosts)
+        except AttributeError:
+            hosts = []
+        self._emit('play_start', run_id=self._run_id, play=play.get_name().strip(), strategy=play.strategy,
+                   hosts=[host.get_name() for host in hosts])
+
+    def v2_runner_on_start(self, host, task):
+        stage = task_stage(task)
+        if stage is None:
+            return
+        name = host.get_name()
+        current = self._stages.get(name)
+        if current is not None and current['stage'] == stage:
+            return
+        if current is not None:
+            self._end_stage(name)
+        if stage not in self._container_stages:
+            self._stages[name] = {'stage': stage, 'start': time.time(), 'failures': 0}
+            self._emit('stage_start', host=name, stage=stage)
+
+    # ------------------------------------------------------------------ results
+
+    def v2_runner_on_ok(self, result):
+        self._milestone(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        if not ignore_errors:
+            name = result._host.get_name()
+            if name in self._stages:
+                self._stages[name]['failures'] += 1
+            self._emit('task_failed', host=name, stage=task_stage(result._task), task=result._task.get_name().strip(),
+                       msg=str(result._result.get('msg', ''))[:500])
+        self._milestone(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._milestone(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        name = result._host.get_name()
+        self._end_stage(name, 'unreachable')
+        self._emit('host_unreachable', host=name, task=result._task.get_name().strip(),
+                   msg=str(result._result.get('msg', ''))[:500])
+
+    def v2_playbook_on_stats(self, stats):
+        self._close_stages()
+        self._emit('run_end', run_id=self._run_id,
+                   hosts={host: stats.summarize(host) for host in sorted(stats.processed)})
+        if self._file is not None:
+            self._file.close()
+        if self._socket is not None:
+            self._socket.close()
+
+    # ------------------------------------------------------------------ internals
+
+    def _emit(self, event, **fields):
+        if self._target is None:
+            return
+        record = {'time': round(time.time(), 3), 'event': event}
+        record.update(fields)
+        line = json.dumps(record, default=str) + '\n'
+        try:
+            if self._socket is not None:
+                self._socket.sendto(line.encode('utf-8'), self._target[len(SOCKET_PREFIX):])
+            else:
+                self._file.write(line)
+                self._file.flush()
+        except (IOError, OSError):
+            # No viewer listening on the socket, or disk full: progress must not stop the run
+            pass
+
+    def _milestone(self, result, status):
+        task = result._task
+        event = (task.vars or {}).get('progress_event')
+        if not event or not isinstance(event, str):
+            return
+        data = {key: result._result[key] for key in MILESTONE_FIELDS if key in result._result}
+        if task.action in ('set_fact', 'ansible.builtin.set_fact') and 'ansible_facts' in result._result:
+            data['facts'] = result._result['ansible_facts']
+        self._emit(event, host=result._host.get_name(), stage=task_stage(task), status=status, **data)
+
+    def _end_stage(self, name, status=None):
+        current = self._stages.pop(name, None)
+        if current is None:
+            return
+        self._emit('stage_end', host=name, stage=current['stage'],
+                   status=status or ('failed' if current['failures'] else 'ok'),
+                   duration=round(time.time() - current['start'], 3), failures=current['failures'])
+
+    def _close_stages(self):
+        for name in list(self._stages):
+            self._end_stage(name)
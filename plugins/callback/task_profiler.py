@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: task_profiler
+type: aggregate
+short_description: Per-task, per-host timing trace with critical-path report
+description:
+  - Records the wall-clock time of every task on every host, from the start of the task
+    on the host (C(v2_runner_on_start)) to its result; it includes the connection, the
+    transfer of the module and its execution.
+  - Streams one JSON record per task result to a JSONL trace file while the play runs.
+  - At the end of the playbook, writes a summary with the slowest tasks, the slowest
+    hosts and the critical path of each play, plus a Chrome trace (chrome://tracing,
+    Perfetto) and a folded-stack file for flamegraph tools.
+  - The critical path follows, backwards from the last result of a play, whichever
+    predecessor finished last; the previous task on the same host or, with the
+    linear strategy, the slowest host of the previous task.
+version_added: "1.0.0"
+requirements:
+  - Enable it with C(callbacks_enabled = task_profiler) in ansible.cfg or
+    C(ANSIBLE_CALLBACKS_ENABLED=task_profiler)
+options:
+  output_dir:
+    description: Directory where trace, summary, Chrome trace and folded files are written.
+    type: path
+    default: ./profiles
+    env:
+      - name: ARUBA_PROFILE_DIR
+    ini:
+      - section: callback_task_profiler
+        key: output_dir
+  top_n:
+    description: Number of tasks and hosts listed in the summary.
+    type: int
+    default: 10
+    env:
+      - name: ARUBA_PROFILE_TOP_N
+    ini:
+      - section: callback_task_profiler
+        key: top_n
+  chrome_trace:
+    description: Also write the Chrome trace and folded-stack files.
+    type: bool
+    default: true
+    env:
+      - name: ARUBA_PROFILE_CHROME_TRACE
+    ini:
+      - section: callback_task_profiler
+        key: chrome_trace
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+
+from ansible.plugins.callback import CallbackBase
+
+
+def critical_path(records, linear=True):
+    """Computes the critical path of a play.
+
+    :param records: Task result records of a single play.
+    :param linear: `True` if tasks are separated by a barrier (linear strategy).
+    :return: The list of records on the critical path, in execution order.
+    """
+    if not records:
+        return []
+
+    by_host = defaultdict(list)
+    by_task = defaultdict(list)
+    for record in records:
+        by_host[record['host']].append(record)
+        by_task[record['task_index']].append(record)
+    for host_records in by_host.values():
+        host_records.sort(key=lambda r: r['start'])
+    task_indexes = sorted(by_task)
+    previous_task = dict(zip(task_indexes[1:], task_indexes[:-1]))
+
+    path = []
+    current = max(records, key=lambda r: r['end'])
+    while current is not None:
+        path.append(current)
+        candidates = []
+        host_records = by_host[current['host']]
+        position = host_records.index(current)
+        if position > 0:
+            candidates.append(host_records[position - 1])
+        if linear and current['task_index'] in previous_task:
+            candidates.append(max(by_task[previous_task[current['task_index']]], key=lambda r: r['end']))
+        candidates = [c for c in candidates if c['end'] <= current['start'] + 0.001]
+        current = max(candidates, key=lambda r: r['end']) if candidates else None
+
+    path.reverse()
+    return path
+
+
+class CallbackModule(CallbackBase):
+    """Profiles every task on every host and reports where the time goes."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'task_profiler'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._records = []
+        self._plays = []
+        self._tasks = {}
+        self._host_starts = {}
+        self._trace_file = None
+        self._basename = None
+        self._playbook_start = None
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self._output_dir = self.get_option('output_dir')
+        self._top_n = self.get_option('top_n')
+        self._chrome_trace = self.get_option('chrome_trace')
+
+    # ------------------------------------------------------------------ playbook events
+
+    def v2_playbook_on_start(self, playbook):
+        self._playbook_start = time.time()
+        playbook_name = os.path.splitext(os.path.basename(playbook._file_name))[0]
+        self._basename = os.path.join(
+            self._output_dir, "{0}_{1}".format(playbook_name, time.strftime('%Y%m%d_%H%M%S'))
+        )
+        try:
+            os.makedirs(self._output_dir, exist_ok=True)
+            self._trace_file = open(self._basename + '.trace.jsonl', 'w')
+        except (IOError, OSError) as e:
+            self._display.warning("task_profiler: unable to open trace file: {0}".format(e))
+
+    def v2_playbook_on_play_start(self, play):
+        self._plays.append({
+            'name': play.get_name().strip(),
+            'strategy': play.strategy,
+            'start': time.time(),
+        })
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._register_task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._register_task(task)
+
+    def v2_runner_on_start(self, host, task):
+        self._host_starts[(host.get_name(), task._uuid)] = time.time()
+
+    # ------------------------------------------------------------------ results
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, 'changed' if result._result.get('changed', False) else 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, 'unreachable')
+
+    def v2_playbook_on_stats(self, stats):
+        if self._trace_file is not None:
+            self._trace_file.close()
+        if not self._records:
+            return
+
+        summary = self._build_summary()
+        self._write_json(self._basename + '.summary.json', summary)
+        if self._chrome_trace:
+            self._write_json(self._basename + '.chrome.json', self._chrome_events())
+            self._write_folded(self._basename + '.folded')
+        self._display_summary(summary)
+
+    # ------------------------------------------------------------------ internals
+
+    def _register_task(self, task):
+        if task._uuid in self._tasks:
+            return
+        self._tasks[task._uuid] = {
+            'index': len(self._tasks),
+            'name': task.get_name().strip(),
+            'role': task._role.get_name() if task._role else '',
+            'path': task.get_path() or '',
+            'start': time.time(),
+            'play_index': len(self._plays) - 1,
+        }
+
+    def _record(self, result, status):
+        end = time.time()
+        host = result._host.get_name()
+        task = result._task
+        self._register_task(task)
+        task_info = self._tasks[task._uuid]
+        start = self._host_starts.pop((host, task._uuid), task_info['start'])
+
+        record = {
+            'play': task_info['play_index'],
+            'task_index': task_info['index'],
+            'task': task_info['name'],
+            'role': task_info['role'],
+            'path': task_info['path'],
+            'host': host,
+            'status': status,
+            'start': round(start, 6),
+            'end': round(end, 6),
+            'wall_seconds': round(end - start, 6),
+        }
+        self._records.append(record)
+        if self._trace_file is not None:
+            self._trace_file.write(json.dumps(record) + '\n')
+            self._trace_file.flush()
+
+    def _build_summary(self):
+        tasks = {}
+        hosts = defaultdict(lambda: {'wall_seconds': 0.0, 'tasks': 0, 'failed': 0})
+        for record in self._records:
+            entry = tasks.setdefault(record['task_index'], {
+                'task': record['task'], 'role': record['role'], 'path': record['path'],
+                'hosts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'slowest_host': None,
+            })
+            entry['hosts'] += 1
+            entry['total_seconds'] += record['wall_seconds']
+            if record['wall_seconds'] >= entry['max_seconds']:
+                entry['max_seconds'] = record['wall_seconds']
+                entry['slowest_host'] = record['host']
+
+            host = hosts[record['host']]
+            host['wall_seconds'] += record['wall_seconds']
+            host['tasks'] += 1
+            if record['status'] in ('failed', 'unreachable'):
+                host['failed'] += 1
+
+        for entry in tasks.values():
+            entry['mean_seconds'] = round(entry['total_seconds'] / entry['hosts'], 3)
+            entry['total_seconds'] = round(entry['total_seconds'], 3)
+            entry['max_seconds'] = round(entry['max_seconds'], 3)
+
+        slowest_tasks = sorted(tasks.values(), key=lambda e: e['max_seconds'], reverse=True)[:self._top_n]
+        slowest_hosts = sorted(
+            ({'host': name, 'wall_seconds': round(h['wall_seconds'], 3), 'tasks': h['tasks'], 'failed': h['failed']}
+             for name, h in hosts.items()),
+            key=lambda e: e['wall_seconds'], reverse=True,
+        )[:self._top_n]
+
+        plays = []
+        for play_index, play in enumerate(self._plays):
+            play_records = [r for r in self._records if r['play'] == play_index]
+            if not play_records:
+                continue
+            path = critical_path(play_records, linear=play['strategy'] not in ('free', 'host_pinned'))
+            plays.append({
+                'name': play['name'],
+                'strategy': play['strategy'],
+                'wall_seconds': round(max(r['end'] for r in play_records) - min(r['start'] for r in play_records), 3),
+                'critical_path_busy_seconds': round(sum(r['wall_seconds'] for r in path), 3),
+                'critical_path': [
+                    {'task': r['task'], 'role': r['role'], 'host': r['host'], 'wall_seconds': round(r['wall_seconds'], 3)}
+                    for r in path
+                ],
+            })
+
+        return {
+            'wall_seconds': round(time.time() - self._playbook_start, 3),
+            'results': len(self._records),
+            'hosts': len(hosts),
+            'slowest_tasks': slowest_tasks,
+            'slowest_hosts': slowest_hosts,
+            'plays': plays,
+        }
+
+    def _chrome_events(self):
+        origin = self._playbook_start
+        host_ids = {}
+        events = []
+        for record in self._records:
+            if record['host'] not in host_ids:
+                host_ids[record['host']] = len(host_ids) + 1
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': host_ids[record['host']],
+                               'args': {'name': record['host']}})
+            events.append({
+                'name': record['task'],
+                'cat': record['role'] or 'play',
+                'ph': 'X',
+                'pid': 1,
+                'tid': host_ids[record['host']],
+                'ts': int((record['start'] - origin) * 1e6),
+                'dur': int(record['wall_seconds'] * 1e6),
+                'args': {'status': record['status']},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def _write_folded(self, path):
+        stacks = defaultdict(float)
+        for record in self._records:
+            play = self._plays[record['play']]['name'] if record['play'] >= 0 else 'play'
+            frames = [play, record['role'] or '-', record['task']]
+            stacks[';'.join(f.replace(';', ',').replace(' ', '_') for f in frames)] += record['wall_seconds']
+        try:
+            with open(path, 'w') as f:
+                for stack, seconds in sorted(stacks.items()):
+                    f.write("{0} {1}\n".format(stack, int(seconds * 1000)))
+        except (IOError, OSError) as e:
+            self._display.warning("task_profiler: unable to write {0}: {1}".format(path, e))
+
+    def _write_json(self, path, data):
+        try:
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+        except (IOError, OSError) as e:
+            self._display.warning("task_profiler: unable to write {0}: {1}".format(path, e))
+
+    def _display_summary(self, summary):
+        self._display.banner("TASK PROFILER")
+        self._display.display("Slowest tasks (max over hosts):")
+        for entry in summary['slowest_tasks']:
+            self._display.display("  {0:>9.2f}s  {1}{2} (slowest: {3}, mean {4:.2f}s on {5} hosts)".format(
+                entry['max_seconds'], entry['role'] + ' : ' if entry['role'] else '', entry['task'],
+                entry['slowest_host'], entry['mean_seconds'], entry['hosts']))
+        self._display.display("Slowest hosts (sum of task times):")
+        for entry in summary['slowest_hosts']:
+            self._display.display("  {0:>9.2f}s  {1} ({2} tasks, {3} failed)".format(
+                entry['wall_seconds'], entry['host'], entry['tasks'], entry['failed']))
+        for play in summary['plays']:
+            self._display.display("Critical path of play '{0}' ({1}): {2:.2f}s busy over {3:.2f}s wall, {4} steps".format(
+                play['name'], play['strategy'], play['critical_path_busy_seconds'], play['wall_seconds'],
+                len(play['critical_path'])))
+        self._display.display("Profile written to {0}.*".format(self._basename))
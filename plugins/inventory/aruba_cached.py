@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: aruba_cached
+version_added: "1.0.0"
+short_description: Aruba AOS-CX inventory built from the last inventory collection
+description:
+  - Builds the switch inventory from the JSON file written by the C(inventory_collector) role
+    (C(inventory_cache_file)), without connecting to any switch
+  - Hosts are grouped by model, series and running version, and compared with the target
+    firmware version so plays can target only the switches that need an upgrade
+  - Switches whose last collection failed are put in a dedicated group
+  - The configuration file name must end with C(aruba_cached.yml) or C(aruba_cached.yaml)
+author:
+  - Aruba Manager Team
+extends_documentation_fragment:
+  - constructed
+options:
+  plugin:
+    description:
+      - Name of the plugin
+    required: true
+    choices: ["aruba_cached"]
+  source:
+    description:
+      - JSON file written by the C(inventory_collector) role
+      - Relative paths are resolved from the directory of the configuration file
+    required: true
+    type: str
+  max_age:
+    description:
+      - Maximum age in seconds of the source file, based on its modification time
+      - C(0) disables the check
+    type: int
+    default: 86400
+  stale_behavior:
+    description:
+      - What to do when the source file is older than I(max_age)
+      - C(error) refuses to build the inventory, C(warn) builds it and sets C(aruba_inventory_stale) on every host
+    type: str
+    default: error
+    choices: ["error", "warn"]
+  parent_group:
+    description:
+      - Group containing every switch, targeted by the playbooks of the project
+    type: str
+    default: switches_aruba
+  connection_vars:
+    description:
+      - Variables set on I(parent_group), the inventory file of the collection does not provide them
+      - The default mirrors the C(switches_aruba) group of C(inventory/example.yml); Jinja expressions
+        such as C({{ aruba_user }}) are resolved when the play runs
+    type: dict
+    default:
+      ansible_connection: arubanetworks.aoscx.aoscx
+      ansible_network_os: arubanetworks.aoscx.aoscx
+      ansible_become: false
+      ansible_user: "{{ aruba_user }}"
+      ansible_password: "{{ aruba_password }}"
+  group_prefix:
+    description:
+      - Prefix of the generated model, series, version and status groups
+    type: str
+    default: aruba_
+  target_firmware_version:
+    description:
+      - Firmware version expected on every switch
+      - Switches running another version are put in the C(<prefix>needs_upgrade) group
+    type: str
+  target_firmware_versions:
+    description:
+      - Expected firmware version per model number (C(6300), C(8320)...), overrides I(target_firmware_version)
+    type: dict
+    default: {}
+"""
+
+EXAMPLES = r"""
+# inventory/switches.aruba_cached.yml
+plugin: aruba_cached
+source: cache/aruba_inventory.json
+max_age: 43200
+target_firmware_versions:
+  "6200": ML.10.13.1110
+  "6300": FL.10.13.1110
+keyed_groups:
+  - key: aruba_platform
+    prefix: platform
+
+# Connection through a vault-stored account instead of aruba_user/aruba_password
+connection_vars:
+  ansible_connection: arubanetworks.aoscx.aoscx
+  ansible_network_os: arubanetworks.aoscx.aoscx
+  ansible_user: "{{ vault_switch_user }}"
+  ansible_password: "{{ vault_switch_password }}"
+
+# ansible-playbook -i inventory/switches.aruba_cached.yml update_firmware.yml --limit aruba_needs_upgrade
+"""
+
+import json
+import os
+import re
+import time
+
+from ansible.errors import AnsibleParserError
+from ansible.module_utils._text import to_native
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable
+
+COLLECT_FAILED = 'ÉCHEC DE COLLECTE'
+MODEL_PATTERN = re.compile(r'(6[0-9]{3}|8[0-9]{3})')
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable):
+
+    NAME = 'aruba_cached'
+
+    def verify_file(self, path):
+        """Only accept configuration files meant for this plugin."""
+        return super(InventoryModule, self).verify_file(path) and \
+            path.endswith(('aruba_cached.yml', 'aruba_cached.yaml'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        source = os.path.expanduser(self.get_option('source'))
+        if not os.path.isabs(source):
+            source = os.path.join(os.path.dirname(path), source)
+
+        stale = self._check_age(source)
+        records = self._load_records(source)
+
+        prefix = self.get_option('group_prefix')
+        parent_group = self.inventory.add_group(self.get_option('parent_group'))
+        for key, value in self.get_option('connection_vars').items():
+            self.inventory.set_variable(parent_group, key, value)
+        strict = self.get_option('strict')
+
+        for record in records:
+            hostname = record.get('inventaire_hote') or record.get('adresse_ip') or record.get('nom_switch')
+            if not hostname:
+                continue
+            self.inventory.add_host(hostname, group=parent_group)
+
+            host_vars = self._host_vars(record, stale)
+            for key, value in host_vars.items():
+                self.inventory.set_variable(hostname, key, value)
+            if record.get('ansible_host'):
+                self.inventory.set_variable(hostname, 'ansible_host', record['ansible_host'])
+
+            for group in self._status_groups(host_vars, prefix):
+                self.inventory.add_child(self.inventory.add_group(group), hostname)
+
+            self._set_composite_vars(self.get_option('compose'), host_vars, hostname, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), host_vars, hostname, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), host_vars, hostname, strict=strict)
+
+    def _check_age(self, source):
+        """Returns True when the source is older than max_age and stale data is allowed."""
+        max_age = self.get_option('max_age')
+        try:
+            age = time.time() - os.path.getmtime(source)
+        except OSError as e:
+            raise AnsibleParserError('Unable to read inventory collection {0}: {1}'.format(source, to_native(e)))
+
+        if not max_age or age <= max_age:
+            return False
+        msg = 'Inventory collection {0} is {1}h old (max_age {2}h), run collecte_inventaire.yml to refresh it'.format(
+            source, int(age // 3600), int(max_age // 3600))
+        if self.get_option('stale_behavior') == 'error':
+            raise AnsibleParserError(msg)
+        self.display.warning(msg)
+        return True
+
+    def _load_records(self, source):
+        try:
+            with open(source, 'r') as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            raise AnsibleParserError('Unable to parse inventory collection {0}: {1}'.format(source, to_native(e)))
+
+        if isinstance(data, dict):
+            data = data.get('switches', [])
+        if not isinstance(data, list):
+            raise AnsibleParserError('Inventory collection {0} must contain a list of switches'.format(source))
+        return [record for record in data if isinstance(record, dict)]
+
+    def _host_vars(self, record, stale):
+        collected = record.get('modele') != COLLECT_FAILED
+        model_match = MODEL_PATTERN.search('{0} {1}'.format(
+            record.get('modele', ''), record.get('product_description', ''))) if collected else None
+        model = model_match.group(1) if model_match else 'unknown'
+        series = model[0] + '000' if model_match else 'unknown'
+        version = record.get('version_os', '') if collected else ''
+
+        target = self.get_option('target_firmware_versions').get(model) or self.get_option('target_firmware_version')
+        host_vars = {
+            'aruba_collected': collected,
+            'aruba_collected_at': record.get('date_collecte', ''),
+            'aruba_model': model,
+            'aruba_series': series,
+            'aruba_running_version': version,
+            'aruba_serial': record.get('serial', '') if collected else '',
+            'aruba_platform': record.get('platform', '') if collected else '',
+            'aruba_inventory_stale': stale,
+        }
+        if target:
+            host_vars['aruba_target_version'] = target
+            host_vars['aruba_needs_upgrade'] = collected and version != target
+        return host_vars
+
+    def _status_groups(self, host_vars, prefix):
+        if not host_vars['aruba_collected']:
+            return [prefix + 'collect_failed']
+
+        groups = [
+            prefix + 'model_' + host_vars['aruba_model'],
+            prefix + 'series_' + host_vars['aruba_series'],
+        ]
+        if host_vars['aruba_running_version']:
+            groups.append(self._sanitize_group_name(prefix + 'version_' + host_vars['aruba_running_version']))
+        if 'aruba_needs_upgrade' in host_vars:
+            groups.append(prefix + ('needs_upgrade' if host_vars['aruba_needs_upgrade'] else 'up_to_date'))
+        return groups
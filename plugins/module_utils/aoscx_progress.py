@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import socket
+import time
+
+PROGRESS_ENV = 'ARUBA_PROGRESS_EVENTS'
+SOCKET_PREFIX = 'unix:'
+
+
+class ProgressEmitter(object):
+    """Appends JSON events to a JSONL file or sends them to a Unix datagram socket.
+
+    Progress reporting must never break the operation it reports on: write
+    errors are swallowed and a socket without listener simply drops events.
+    """
+
+    def __init__(self, target=None, host=None, interval=0.0):
+        """
+        :param target: JSONL file path or 'unix:<path>', defaults to $ARUBA_PROGRESS_EVENTS.
+        :param host: Inventory hostname added to every event.
+        :param interval: Minimum time in seconds between two throttled events.
+        """
+        self.target = target if target is not None else os.environ.get(PROGRESS_ENV, '')
+        self.host = host
+        self.interval = interval
+        self._last = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.target)
+
+    def emit(self, event, **fields):
+        """Sends one event, returns True if it was written."""
+        if not self.target:
+            return False
+        record = {'time': round(time.time(), 3), 'event': event}
+        if self.host:
+            record['host'] = self.host
+        record.update(fields)
+        line = json.dumps(record, default=str) + '\n'
+        try:
+            if self.target.startswith(SOCKET_PREFIX):
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                try:
+                    sock.sendto(line.encode('utf-8'), self.target[len(SOCKET_PREFIX):])
+                finally:
+                    sock.close()
+            else:
+                # A single O_APPEND write per event keeps lines whole when several
+                # processes share the file
+                fd = os.open(self.target, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line.encode('utf-8'))
+                finally:
+                    os.close(fd)
+        except (IOError, OSError):
+            return False
+        return True
+
+    def throttled(self, event, **fields):
+        """Sends the event unless another one was sent less than `interval` seconds ago."""
+        now = time.time()
+        if now - self._last < self.interval:
+            return False
+        self._last = now
+        return self.emit(event, **fields)
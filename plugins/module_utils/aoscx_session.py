@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six.moves.urllib.parse import urlencode, urlsplit
+from ansible.module_utils.urls import open_url
+import hashlib
+import json
+import os
+import ssl
+import time
+import uuid
+
+DEFAULT_API_VERSION = 'v10.09'
+DEFAULT_CACHE_DIR = '~/.ansible/aoscx_sessions'
+DEFAULT_SESSION_TTL = 600
+DEFAULT_TIMEOUT = 30
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+SESSION_COOKIE = 'id'
+
+
+class AoscxSessionError(Exception):
+    """Raised when the REST API cannot be reached or refuses the login."""
+
+    def __init__(self, msg, status=None):
+        super(AoscxSessionError, self).__init__(msg)
+        self.status = status
+
+
+class AoscxSession(object):
+    """Authenticated AOS-CX REST session shared across module invocations.
+
+    The session cookie is cached on the controller, one file per switch and user,
+    so that consecutive tasks reuse the same login instead of opening and closing
+    a REST session each time. A cached cookie is used until it has been idle for
+    `session_ttl` seconds. A 401 answer (session expired, switch rebooted) drops
+    the cached cookie, logs in again and replays the request once.
+    """
+
+    def __init__(self, host, username, password, port=None, api_version=DEFAULT_API_VERSION,
+                 use_ssl=True, validate_certs=False, timeout=DEFAULT_TIMEOUT,
+                 cache_dir=DEFAULT_CACHE_DIR, session_ttl=DEFAULT_SESSION_TTL):
+        """
+        :param host: The Switch address.
+        :param username: The username to authenticate as.
+        :param password: The password to use for authentication.
+        :param port: TCP port, defaults to 443 with SSL and 80 without.
+        :param api_version: REST API version used in the URL prefix.
+        :param use_ssl: Use HTTPS.
+        :param validate_certs: Validate the Switch certificate.
+        :param timeout: Socket timeout in seconds for each request.
+        :param cache_dir: Controller directory holding the session cookies.
+        :param session_ttl: Maximum idle time in seconds before a cached cookie
+            is considered expired.
+        """
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port or (443 if use_ssl else 80)
+        self.api_version = api_version
+        self.validate_certs = validate_certs
+        self.timeout = timeout
+        self.session_ttl = session_ttl
+        self.use_ssl = use_ssl
+        self.base_url = '{0}://{1}:{2}/rest/{3}/'.format(
+            'https' if use_ssl else 'http', host, self.port, api_version)
+
+        cache_key = hashlib.sha256(
+            '{0}:{1}:{2}'.format(host, self.port, username).encode('utf-8')).hexdigest()
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.cache_file = os.path.join(self.cache_dir, cache_key + '.json')
+        self.cookie = None
+        self.reused = False
+        self.logins = 0
+
+    def request(self, method, path, data=None, headers=None, timeout=None):
+        """Sends a REST request using the cached session, logging in if needed.
+
+        :param method: HTTP method.
+        :param path: Resource path relative to the API prefix (e.g. 'system').
+        :param data: Request body, `dict`/`list` values are JSON encoded.
+        :param headers: Additional HTTP headers.
+        :param timeout: Overrides the session timeout for this request.
+        :return: Tuple (status, decoded JSON body or raw text, `None` if empty).
+        """
+        if self.cookie is None:
+            self._load_cookie()
+        if self.cookie is None:
+            self.login()
+
+        try:
+            return self._send(method, path, data, headers, timeout)
+        except HTTPError as e:
+            if e.code != 401:
+                raise AoscxSessionError(self._error_message(e), status=e.code)
+        except Exception as e:
+            raise AoscxSessionError('Unable to reach {0}: {1}'.format(self.host, to_text(e)))
+
+        # Cookie refused: expired session or rebooted switch
+        self.invalidate()
+        self.login()
+        try:
+            return self._send(method, path, data, headers, timeout)
+        except HTTPError as e:
+            raise AoscxSessionError(self._error_message(e), status=e.code)
+        except Exception as e:
+            raise AoscxSessionError('Unable to reach {0}: {1}'.format(self.host, to_text(e)))
+
+    def upload(self, path, file_path, field_name='fileupload', checksum=None,
+               checksum_algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE, timeout=None, progress=None):
+        """Streams a file as multipart/form-data, hashing it while it is sent.
+
+        The file is read once, in `chunk_size` blocks, each block being added
+        to the digest and written to the socket. When `checksum` is given, the
+        closing multipart boundary is only sent if the digest matches: on a
+        mismatch the connection is dropped, the Switch sees a truncated upload
+        and never writes the image.
+
+        :param path: Resource path relative to the API prefix (e.g. 'firmware?image=primary').
+        :param file_path: Local file to send.
+        :param field_name: Name of the multipart form field.
+        :param checksum: Expected hexadecimal digest of the file, optional.
+        :param checksum_algorithm: `hashlib` algorithm used for the digest.
+        :param chunk_size: Size in bytes of the blocks read and sent.
+        :param timeout: Overrides the session timeout for this request.
+        :param progress: Callable receiving the number of file bytes sent after each block, optional.
+        :return: Tuple (status, decoded JSON body or raw text, hexadecimal digest).
+        """
+        # A cookie refused at the end of the transfer would mean reading the
+        # file again, check the session with a cheap request first
+        self.request('GET', 'system?attributes=platform_name')
+
+        boundary = uuid.uuid4().hex
+        head = to_bytes(
+            '--{0}\r\nContent-Disposition: form-data; name="{1}"; filename="{2}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'.format(boundary, field_name, os.path.basename(file_path)))
+        tail = to_bytes('\r\n--{0}--\r\n'.format(boundary))
+        digest = hashlib.new(checksum_algorithm)
+
+        connection = self._connection(timeout)
+        try:
+            connection.putrequest('POST', urlsplit(self.base_url).path + path.lstrip('/'))
+            connection.putheader('Cookie', '{0}={1}'.format(SESSION_COOKIE, self.cookie))
+            connection.putheader('Accept', 'application/json')
+            connection.putheader('Content-Type', 'multipart/form-data; boundary={0}'.format(boundary))
+            connection.putheader('Content-Length', str(len(head) + os.path.getsize(file_path) + len(tail)))
+            connection.endheaders()
+            connection.send(head)
+
+            sent = 0
+            with open(file_path, 'rb') as f:
+                chunk = f.read(chunk_size)
+                while chunk:
+                    digest.update(chunk)
+                    connection.send(chunk)
+                    sent += len(chunk)
+                    if progress is not None:
+                        progress(sent)
+                    chunk = f.read(chunk_size)
+
+            if checksum and digest.hexdigest() != checksum.strip().lower():
+                raise AoscxSessionError('{0} checksum mismatch for {1}: expected {2}, got {3}, transfer aborted'.format(
+                    checksum_algorithm, file_path, checksum.strip().lower(), digest.hexdigest()))
+
+            connection.send(tail)
+            response = connection.getresponse()
+            content = response.read()
+        except AoscxSessionError:
+            raise
+        except (IOError, OSError, http_client.HTTPException) as e:
+            raise AoscxSessionError('Upload to {0} failed: {1}'.format(self.host, to_text(e)))
+        finally:
+            connection.close()
+
+        if response.status == 401:
+            self.invalidate()
+        if response.status >= 400:
+            raise AoscxSessionError('HTTP {0} {1}'.format(response.status, to_text(content) or response.reason),
+                                    status=response.status)
+        self._store_cookie()
+        try:
+            content = json.loads(to_text(content)) if content else None
+        except ValueError:
+            content = to_text(content)
+        return response.status, content, digest.hexdigest()
+
+    def login(self):
+        """Opens a new REST session and stores its cookie in the cache."""
+        body = urlencode({'username': self.username, 'password': self.password})
+        try:
+            response = open_url(self.base_url + 'login', method='POST', data=body,
+                                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                                validate_certs=self.validate_certs, timeout=self.timeout)
+        except HTTPError as e:
+            raise AoscxSessionError('Login failed on {0}: {1}'.format(
+                self.host, self._error_message(e)), status=e.code)
+        except Exception as e:
+            raise AoscxSessionError('Unable to reach {0}: {1}'.format(self.host, to_text(e)))
+
+        cookie = self._parse_cookie(response.headers.get_all('Set-Cookie') or [])
+        if cookie is None:
+            raise AoscxSessionError('Login on {0} did not return a session cookie'.format(self.host))
+        self.cookie = cookie
+        self.reused = False
+        self.logins += 1
+        self._store_cookie()
+
+    def logout(self):
+        """Closes the REST session on the Switch and drops the cached cookie."""
+        if self.cookie is None:
+            self._load_cookie()
+        if self.cookie is not None:
+            try:
+                self._send('POST', 'logout')
+            except Exception:
+                pass
+        self.invalidate()
+
+    def invalidate(self):
+        """Forgets the current cookie, in memory and in the cache."""
+        self.cookie = None
+        self.reused = False
+        try:
+            os.remove(self.cache_file)
+        except OSError:
+            pass
+
+    def _connection(self, timeout=None):
+        if not self.use_ssl:
+            return http_client.HTTPConnection(self.host, self.port, timeout=timeout or self.timeout)
+        context = ssl.create_default_context()
+        if not self.validate_certs:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return http_client.HTTPSConnection(self.host, self.port, timeout=timeout or self.timeout, context=context)
+
+    def _send(self, method, path, data=None, headers=None, timeout=None):
+        request_headers = {'Cookie': '{0}={1}'.format(SESSION_COOKIE, self.cookie),
+                           'Accept': 'application/json'}
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+            request_headers['Content-Type'] = 'application/json'
+        request_headers.update(headers or {})
+
+        response = open_url(self.base_url + path.lstrip('/'), method=method, data=data,
+                            headers=request_headers, validate_certs=self.validate_certs,
+                            timeout=timeout or self.timeout)
+        self._store_cookie()
+
+        content = response.read()
+        if not content:
+            return response.getcode(), None
+        try:
+            return response.getcode(), json.loads(to_text(content))
+        except ValueError:
+            return response.getcode(), to_text(content)
+
+    def _load_cookie(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if time.time() - cached.get('last_used', 0) < self.session_ttl:
+            self.cookie = cached.get('cookie')
+            self.reused = self.cookie is not None
+
+    def _store_cookie(self):
+        if self.cookie is None:
+            return
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0o700)
+            fd = os.open(self.cache_file + '.tmp', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'host': self.host, 'cookie': self.cookie, 'last_used': time.time()}, f)
+            os.rename(self.cache_file + '.tmp', self.cache_file)
+        except (IOError, OSError):
+            # Cache is an optimisation only, a new login will happen next time
+            pass
+
+    @staticmethod
+    def _parse_cookie(set_cookie_headers):
+        for header in set_cookie_headers:
+            name, _, value = header.split(';', 1)[0].strip().partition('=')
+            if name == SESSION_COOKIE and value:
+                return value
+        return None
+
+    @staticmethod
+    def _error_message(error):
+        try:
+            body = to_text(error.read())
+        except Exception:
+            body = ''
+        return 'HTTP {0} {1}'.format(error.code, body or error.reason)
+
+
+def session_from_params(params):
+    """Builds an AoscxSession from the common module parameters.
+
+    :param params: `module.params` holding host, port, username, password,
+        api_version, use_ssl, validate_certs, timeout, session_cache_dir and
+        session_ttl.
+    :return: An `AoscxSession` instance.
+    """
+    return AoscxSession(
+        host=params['host'],
+        username=params['username'],
+        password=params['password'],
+        port=params['port'],
+        api_version=params['api_version'],
+        use_ssl=params['use_ssl'],
+        validate_certs=params['validate_certs'],
+        timeout=params['timeout'],
+        cache_dir=params['session_cache_dir'],
+        session_ttl=params['session_ttl'],
+    )
+
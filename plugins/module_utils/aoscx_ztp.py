@@ -12,16 +12,14 @@ __metaclass__ = type
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import missing_required_lib
 from contextlib import closing
+import importlib.util
+import sys
 import time
-import traceback
 
-PARAMIKO_IMP_ERR = None
-try:
-    import paramiko
-    HAS_PARAMIKO_LIB = True
-except ImportError:
-    HAS_PARAMIKO_LIB = False
-    PARAMIKO_IMP_ERR = traceback.format_exc()
+# Importing paramiko costs more than the rest of a failing module run, only
+# look it up here: it is imported by the first SSH attempt (see _paramiko)
+HAS_PARAMIKO_LIB = importlib.util.find_spec('paramiko') is not None
+PARAMIKO_IMP_ERR = None if HAS_PARAMIKO_LIB else 'ModuleNotFoundError: No module named paramiko'
 
 CHANNEL_TIMEOUT = 8
 READ_TIMEOUT = 10
@@ -31,6 +29,20 @@ BLANK_PASSWORD = ""
 ENTER_PASSWORD_MSG = 'Enter new password:'
 CONFIRM_PASSWORD_MSG = 'Confirm new password:'
 SHELL_PROMPT = '#'
+CONNECT_TIMEOUT = 15
+
+# Failure classes of a ZTP attempt
+RETRY_SOON = 'retry_soon'
+RETRY_LATER = 'retry_later'
+PERMANENT = 'permanent'
+
+
+class ZtpError(Exception):
+    """Raised when a ZTP attempt fails, with the class of the failure."""
+
+    def __init__(self, msg, failure_class):
+        super(ZtpError, self).__init__(msg)
+        self.failure_class = failure_class
 
 
 def connect_ztp_device(module, hostname, username, password):
@@ -56,6 +68,26 @@ def connect_ztp_device(module, hostname, username, password):
         module.fail_json(msg=missing_required_lib(
             "paramiko"), exception=PARAMIKO_IMP_ERR)
 
+    try:
+        configure_ztp_device(hostname, username, password)
+    except ZtpError as e:
+        module.log(to_text(e))
+
+
+def configure_ztp_device(hostname, username, password, connect_timeout=CONNECT_TIMEOUT):
+    """Runs one ZTP authentication attempt and raises on failure.
+
+    Same exchange as `connect_ztp_device`, but a failed attempt raises a
+    `ZtpError` carrying its failure class (see `classify_ztp_failure`) so a
+    caller can decide whether to try again.
+
+    :param hostname: The Switch to connect to.
+    :param username: The username to authenticate as.
+    :param password: A password to use for authentication.
+    :param connect_timeout: TCP connect and SSH banner timeout in seconds.
+    """
+    paramiko = _paramiko()
+
     with closing(paramiko.SSHClient()) as ssh_client:
 
         # Define SSH parameters
@@ -63,7 +95,9 @@ def connect_ztp_device(module, hostname, username, password):
                                         'username': username,
                                         'password': BLANK_PASSWORD,
                                         'look_for_keys': False,
-                                        'allow_agent': False}
+                                        'allow_agent': False,
+                                        'timeout': connect_timeout,
+                                        'banner_timeout': connect_timeout}
 
         # Default AutoAdd as Policy
         ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -79,25 +113,196 @@ def connect_ztp_device(module, hostname, username, password):
             shell_channel.settimeout(CHANNEL_TIMEOUT)
 
             # Wait for message and enter new password
-            if wait_for_channel_msg(shell_channel, ENTER_PASSWORD_MSG):
-                write_to_channel(shell_channel, password)
-            else:
-                return
+            if not wait_for_channel_msg(shell_channel, ENTER_PASSWORD_MSG):
+                raise ZtpError("{0}: no '{1}' prompt".format(hostname, ENTER_PASSWORD_MSG), RETRY_LATER)
+            write_to_channel(shell_channel, password)
 
             # Wait for message and confirm new password
-            if wait_for_channel_msg(shell_channel, CONFIRM_PASSWORD_MSG):
-                write_to_channel(shell_channel, password)
-            else:
-                return
+            if not wait_for_channel_msg(shell_channel, CONFIRM_PASSWORD_MSG):
+                raise ZtpError("{0}: no '{1}' prompt".format(hostname, CONFIRM_PASSWORD_MSG), RETRY_LATER)
+            write_to_channel(shell_channel, password)
 
-            # Wait for CLI prompt
-            wait_for_channel_msg(shell_channel, SHELL_PROMPT)
+            # Wait for CLI prompt, the switch may still be applying the password
+            if not wait_for_channel_msg(shell_channel, SHELL_PROMPT):
+                raise ZtpError("{0}: no CLI prompt after password confirmation".format(hostname), RETRY_SOON)
 
-        except paramiko.ssh_exception.AuthenticationException as e:
-            module.log("Unable to authenticate: {0}".format(to_text(e)))
+        except ZtpError:
+            raise
 
         except Exception as e:
-            module.log(to_text(e))
+            failure_class = classify_ztp_failure(e)
+            if failure_class == PERMANENT and isinstance(e, paramiko.ssh_exception.AuthenticationException):
+                raise ZtpError("{0}: unable to authenticate: {1}".format(hostname, to_text(e)), failure_class)
+            raise ZtpError("{0}: {1}".format(hostname, to_text(e) or type(e).__name__), failure_class)
+
+
+def classify_ztp_failure(error):
+    """Tells whether a failed ZTP attempt is worth retrying, and when.
+
+    - `RETRY_SOON`: the switch answers but SSH is not ready yet (connection
+      refused or reset, connect timeout, no SSH banner), typical of a switch
+      still booting, or no CLI prompt was shown after the password.
+    - `RETRY_LATER`: the switch is not reachable yet (no route, network
+      unreachable) or its CLI did not ask for a new password.
+    - `PERMANENT`: retrying cannot help (authentication refused because a
+      password is already set, unknown hostname, unexpected error).
+
+    :param error: The exception raised by the attempt.
+    :return: One of `RETRY_SOON`, `RETRY_LATER`, `PERMANENT`.
+    """
+    if isinstance(error, ZtpError):
+        return error.failure_class
+
+    import errno
+    import socket
+
+    # A paramiko exception implies paramiko was imported by the attempt
+    paramiko = sys.modules.get('paramiko')
+    if paramiko is not None:
+        if isinstance(error, paramiko.ssh_exception.AuthenticationException):
+            return PERMANENT
+        if isinstance(error, paramiko.ssh_exception.NoValidConnectionsError):
+            # One socket error per address tried, the most hopeful one wins
+            classes = [classify_ztp_failure(e) for e in error.errors.values()]
+            for failure_class in (RETRY_SOON, RETRY_LATER):
+                if failure_class in classes:
+                    return failure_class
+            return PERMANENT
+        if isinstance(error, paramiko.ssh_exception.SSHException):
+            # Banner or key exchange errors while sshd is starting
+            return RETRY_SOON
+
+    if isinstance(error, socket.gaierror):
+        return PERMANENT
+    if isinstance(error, (socket.timeout, ConnectionRefusedError, ConnectionResetError, EOFError)):
+        return RETRY_SOON
+    if isinstance(error, OSError):
+        if error.errno in (errno.ECONNREFUSED, errno.ECONNRESET, errno.ETIMEDOUT):
+            return RETRY_SOON
+        if error.errno in (errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EHOSTDOWN):
+            return RETRY_LATER
+    return PERMANENT
+
+
+class ZtpRetryQueue(object):
+    """Runs ZTP attempts for many switches with a bounded pool and a delay queue.
+
+    Each switch is attempted as soon as a worker is free. A failed attempt is
+    classified: permanent failures are final, retryable ones go back on the
+    delay queue with an exponential backoff and jitter while the other
+    switches keep being processed. A switch is given up when it reaches
+    `max_attempts` or when its next attempt would start after `deadline`.
+    """
+
+    def __init__(self, attempt, workers=10, max_attempts=10, retry_soon_delay=10,
+                 retry_later_delay=60, max_delay=300, deadline=1800, jitter=0.5):
+        """
+        :param attempt: Callable run for each switch with the arguments given
+            to `add`, returns on success and raises on failure.
+        :param workers: Maximum number of attempts running at the same time.
+        :param max_attempts: Maximum number of attempts per switch.
+        :param retry_soon_delay: Base delay in seconds for `RETRY_SOON` failures.
+        :param retry_later_delay: Base delay in seconds for `RETRY_LATER` failures.
+        :param max_delay: Upper bound of the backoff delay in seconds.
+        :param deadline: Time in seconds after which no new attempt is started.
+        :param jitter: Fraction of the delay that is randomized (0 to 1).
+        """
+        self.attempt = attempt
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delays = {RETRY_SOON: retry_soon_delay, RETRY_LATER: retry_later_delay}
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.jitter = jitter
+        self.results = {}
+        self._queue = []
+        self._sequence = 0
+
+    def add(self, name, *args):
+        """Queues a switch for an immediate first attempt.
+
+        :param name: Key of the switch in `results`.
+        :param args: Arguments passed to the attempt callable.
+        """
+        self.results[name] = {'status': 'pending', 'attempts': 0, 'history': []}
+        self._push(0, name, args)
+
+    def backoff(self, failure_class, attempts):
+        """Delay before the next attempt, exponential in the attempt count with jitter."""
+        import random
+
+        delay = min(self.max_delay, self.base_delays[failure_class] * (2 ** (attempts - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def run(self):
+        """Processes the queue until every switch succeeded or was given up.
+
+        :return: `results`, a dict per switch with `status` (`configured` or
+            `failed`), `attempts`, `failure_class`, `msg`, `elapsed` and the
+            `history` of failed attempts.
+        """
+        # Only the bulk path needs a pool, single attempts do not import it
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        import heapq
+
+        start = time.time()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while self._queue or running:
+                now = time.time()
+                while self._queue and self._queue[0][0] <= now and len(running) < self.workers:
+                    _, _, name, args = heapq.heappop(self._queue)
+                    self.results[name]['attempts'] += 1
+                    running[executor.submit(self.attempt, *args)] = (name, args)
+
+                timeout = None
+                if self._queue and len(running) < self.workers:
+                    timeout = max(0, self._queue[0][0] - time.time())
+                if not running:
+                    time.sleep(timeout or 0)
+                    continue
+
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, args = running.pop(future)
+                    self._finish(name, args, future.exception(), start)
+
+        return self.results
+
+    def _finish(self, name, args, error, start):
+        result = self.results[name]
+        result['elapsed'] = round(time.time() - start, 1)
+        if error is None:
+            result.pop('failure_class', None)
+            result['status'] = 'configured'
+            result['msg'] = 'Authentication configured after {0} attempt(s)'.format(result['attempts'])
+            return
+
+        failure_class = classify_ztp_failure(error)
+        result['failure_class'] = failure_class
+        result['msg'] = to_text(error)
+        result['history'].append({'attempt': result['attempts'], 'failure_class': failure_class,
+                                  'msg': result['msg'], 'time': result['elapsed']})
+
+        if failure_class != PERMANENT and result['attempts'] < self.max_attempts:
+            delay = self.backoff(failure_class, result['attempts'])
+            if time.time() + delay - start <= self.deadline:
+                result['status'] = 'waiting'
+                self._push(delay, name, args)
+                return
+        result['status'] = 'failed'
+
+    def _push(self, delay, name, args):
+        import heapq
+
+        self._sequence += 1
+        heapq.heappush(self._queue, (time.time() + delay, self._sequence, name, args))
+
+
+def _paramiko():
+    """Imports paramiko on first use, later calls hit the import cache."""
+    import paramiko
+    return paramiko
 
 
 def wait_for_channel_msg(shell_channel, msg):
@@ -0,0 +1,236 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: aoscx_rest
+version_added: "1.0.0"
+short_description: Call the AOS-CX REST API through a reusable session
+description:
+  - Sends one request to the REST API of an Aruba AOSCX switch
+  - The session cookie is cached on the controller and reused by the following
+    tasks targeting the same switch, so each task costs one API call instead of
+    a login, the call and a logout
+  - An expired session or a rebooted switch answers 401, the module then logs in
+    again and replays the request once
+  - Run it on the controller (C(delegate_to: localhost) or C(connection: local))
+author:
+  - Aruba Manager Team
+options:
+  host:
+    description:
+      - The IP address or hostname of the target switch
+    required: true
+    type: str
+  port:
+    description:
+      - REST API port, defaults to 443 (or 80 when I(use_ssl=false))
+    required: false
+    type: int
+  username:
+    description:
+      - The username used to log in
+    required: true
+    type: str
+  password:
+    description:
+      - The password used to log in
+    required: true
+    type: str
+  path:
+    description:
+      - Resource path relative to the API prefix, for example C(system) or C(firmware)
+    required: true
+    type: str
+  method:
+    description:
+      - HTTP method
+    required: false
+    type: str
+    default: GET
+    choices: [GET, POST, PUT, PATCH, DELETE]
+  body:
+    description:
+      - Request body, sent as JSON
+    required: false
+    type: raw
+  status_code:
+    description:
+      - Accepted HTTP status codes
+    required: false
+    type: list
+    elements: int
+    default: [200, 201, 204]
+  api_version:
+    description:
+      - REST API version used in the URL prefix
+    required: false
+    type: str
+    default: v10.09
+  use_ssl:
+    description:
+      - Use HTTPS
+    required: false
+    type: bool
+    default: true
+  validate_certs:
+    description:
+      - Validate the switch certificate
+    required: false
+    type: bool
+    default: false
+  timeout:
+    description:
+      - Socket timeout in seconds
+    required: false
+    type: int
+    default: 30
+  session_cache_dir:
+    description:
+      - Controller directory where session cookies are cached (mode 0700)
+    required: false
+    type: path
+    default: ~/.ansible/aoscx_sessions
+  session_ttl:
+    description:
+      - Idle time in seconds after which a cached session is not reused
+      - Keep it below the session idle timeout configured on the switches
+    required: false
+    type: int
+    default: 600
+  logout:
+    description:
+      - Close the REST session after the request, for the last task of a play
+    required: false
+    type: bool
+    default: false
+notes:
+  - Read-only requests (C(GET)) never report a change
+"""
+
+EXAMPLES = r"""
+- name: Read firmware partitions with the shared session
+  aoscx_rest:
+    host: "{{ ansible_host }}"
+    username: "{{ ansible_user }}"
+    password: "{{ ansible_password }}"
+    path: firmware
+  register: firmware_info
+  delegate_to: localhost
+
+- name: Create a VLAN
+  aoscx_rest:
+    host: "{{ ansible_host }}"
+    username: "{{ ansible_user }}"
+    password: "{{ ansible_password }}"
+    path: system/vlans
+    method: POST
+    body:
+      id: 10
+      name: PC
+  delegate_to: localhost
+
+- name: Close the session at the end of the play
+  aoscx_rest:
+    host: "{{ ansible_host }}"
+    username: "{{ ansible_user }}"
+    password: "{{ ansible_password }}"
+    path: system?attributes=hostname
+    logout: true
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+status:
+  description: HTTP status code of the request
+  returned: always
+  type: int
+  sample: 200
+json:
+  description: Decoded response body
+  returned: when the switch returned a body
+  type: raw
+  sample: {"current_version": "FL.10.13.1110"}
+session_reused:
+  description: Whether a cached session cookie was used
+  returned: always
+  type: bool
+  sample: true
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    from ansible.module_utils.aoscx_session import AoscxSessionError, session_from_params
+    HAS_SESSION_UTILS = True
+except ImportError:
+    HAS_SESSION_UTILS = False
+
+
+def main():
+    """Main module execution."""
+
+    module_args = dict(
+        host=dict(type="str", required=True),
+        port=dict(type="int", required=False),
+        username=dict(type="str", required=True),
+        password=dict(type="str", required=True, no_log=True),
+        path=dict(type="str", required=True),
+        method=dict(type="str", default="GET", choices=["GET", "POST", "PUT", "PATCH", "DELETE"]),
+        body=dict(type="raw", required=False),
+        status_code=dict(type="list", elements="int", default=[200, 201, 204]),
+        api_version=dict(type="str", default="v10.09"),
+        use_ssl=dict(type="bool", default=True),
+        validate_certs=dict(type="bool", default=False),
+        timeout=dict(type="int", default=30),
+        session_cache_dir=dict(type="path", default="~/.ansible/aoscx_sessions"),
+        session_ttl=dict(type="int", default=600),
+        logout=dict(type="bool", default=False),
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=False
+    )
+
+    if not HAS_SESSION_UTILS:
+        module.fail_json(
+            msg="Could not import aoscx_session module. "
+                "Ensure the aoscx_session.py file is in the module_utils directory."
+        )
+
+    session = session_from_params(module.params)
+    method = module.params["method"]
+
+    try:
+        status, content = session.request(method, module.params["path"], data=module.params["body"])
+    except AoscxSessionError as e:
+        module.fail_json(msg=str(e), status=e.status, session_reused=session.reused)
+
+    reused = session.reused
+    if module.params["logout"]:
+        session.logout()
+
+    result = dict(
+        changed=method != "GET",
+        status=status,
+        session_reused=reused,
+    )
+    if content is not None:
+        result["json"] = content
+
+    if status not in module.params["status_code"]:
+        module.fail_json(msg=f"Unexpected status {status} for {method} {module.params['path']}", **result)
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
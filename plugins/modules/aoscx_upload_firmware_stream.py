@@ -0,0 +1,329 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: aoscx_upload_firmware_stream
+version_added: "1.0.0"
+short_description: Upload a firmware image to an AOS-CX switch, hashing it during the transfer
+description:
+  - Streams a local C(.swi) image to a partition of an Aruba AOSCX switch through the REST API
+  - The image is read once, in large chunks; each chunk is added to the digest and sent to the switch
+  - When I(checksum) is given, the upload is only completed if the digest matches; otherwise the
+    connection is dropped before the end of the request and the switch discards the image
+  - Uses the REST session cache of M(aoscx_rest)
+  - Run it on the controller (C(delegate_to: localhost))
+author:
+  - Aruba Manager Team
+options:
+  host:
+    description:
+      - The IP address or hostname of the target switch
+    required: true
+    type: str
+  port:
+    description:
+      - REST API port, defaults to 443 (or 80 when I(use_ssl=false))
+    required: false
+    type: int
+  username:
+    description:
+      - The username used to log in
+    required: true
+    type: str
+  password:
+    description:
+      - The password used to log in
+    required: true
+    type: str
+  partition_name:
+    description:
+      - Partition receiving the image
+    required: true
+    type: str
+    choices: [primary, secondary]
+  firmware_file_path:
+    description:
+      - Local path of the firmware image
+    required: true
+    type: path
+  checksum:
+    description:
+      - Expected hexadecimal digest of the image, an optional C(<algorithm>:) prefix is accepted
+      - The upload is aborted before completion when the computed digest differs
+    required: false
+    type: str
+  checksum_algorithm:
+    description:
+      - Digest algorithm
+    required: false
+    type: str
+    default: sha256
+  chunk_size:
+    description:
+      - Size in bytes of the blocks read from disk and sent to the switch
+    required: false
+    type: int
+    default: 4194304
+  wait_firmware_upload:
+    description:
+      - Wait until the switch reports the end of the image installation in C(firmware/status)
+      - The status is read before the upload, a result with the same status and date is taken for an earlier upload
+    required: false
+    type: bool
+    default: true
+  wait_timeout:
+    description:
+      - Maximum time in seconds to wait for C(firmware/status)
+    required: false
+    type: int
+    default: 600
+  api_version:
+    description:
+      - REST API version used in the URL prefix
+    required: false
+    type: str
+    default: v10.09
+  use_ssl:
+    description:
+      - Use HTTPS
+    required: false
+    type: bool
+    default: true
+  validate_certs:
+    description:
+      - Validate the switch certificate
+    required: false
+    type: bool
+    default: false
+  timeout:
+    description:
+      - Socket timeout in seconds, applies to each block sent
+    required: false
+    type: int
+    default: 300
+  session_cache_dir:
+    description:
+      - Controller directory where session cookies are cached (mode 0700)
+    required: false
+    type: path
+    default: ~/.ansible/aoscx_sessions
+  session_ttl:
+    description:
+      - Idle time in seconds after which a cached session is not reused
+    required: false
+    type: int
+    default: 600
+  progress_events:
+    description:
+      - Progress stream receiving C(upload_start), C(upload_progress) and C(upload_end) events,
+        a JSONL file path or C(unix:<socket path>)
+      - Defaults to the C(ARUBA_PROGRESS_EVENTS) environment variable exported by the
+        C(progress_events) callback, no event is sent when both are empty
+    required: false
+    type: str
+  progress_host:
+    description:
+      - Host name put in the progress events, usually C(inventory_hostname)
+    required: false
+    type: str
+  progress_interval:
+    description:
+      - Minimum time in seconds between two C(upload_progress) events
+    required: false
+    type: float
+    default: 2.0
+notes:
+  - The digest is only known once the last block has been read, a mismatch is therefore detected
+    at the end of the transfer but before the switch accepts the image
+"""
+
+EXAMPLES = r"""
+- name: Upload firmware, checked against the vendor checksum
+  aoscx_upload_firmware_stream:
+    host: "{{ ansible_host }}"
+    username: "{{ ansible_user }}"
+    password: "{{ ansible_password }}"
+    partition_name: secondary
+    firmware_file_path: /firmware/6000/6300/ArubaOS-CX_6400-6300_10_13_1110.swi
+    checksum: "sha256:{{ lookup('file', '/firmware/6000/6300/ArubaOS-CX_6400-6300_10_13_1110.swi.sha256').split()[0] }}"
+    progress_host: "{{ inventory_hostname }}"
+  register: upload_result
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+checksum:
+  description: Digest computed during the transfer
+  returned: when the whole image was read
+  type: str
+  sample: 3f0b6c2e...
+size:
+  description: Size of the image in bytes
+  returned: always
+  type: int
+  sample: 524288000
+duration:
+  description: Transfer duration in seconds, without the installation wait
+  returned: always
+  type: float
+  sample: 41.3
+throughput_mbps:
+  description: Average transfer throughput in MB/s
+  returned: always
+  type: float
+  sample: 12.1
+firmware_status:
+  description: Last C(firmware/status) answer of the switch
+  returned: when I(wait_firmware_upload=true)
+  type: dict
+  sample: {"status": "success", "reason": "", "date": 1700000000}
+"""
+
+import os
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    from ansible.module_utils.aoscx_progress import ProgressEmitter
+    from ansible.module_utils.aoscx_session import AoscxSessionError, session_from_params
+    HAS_SESSION_UTILS = True
+except ImportError:
+    HAS_SESSION_UTILS = False
+
+STATUS_POLL_INTERVAL = 5
+FINAL_STATUSES = ("success", "failure", "failed")
+
+
+def read_firmware_status(session):
+    """Returns the firmware/status answer of the switch, {} when it is not available."""
+    try:
+        _, status = session.request("GET", "firmware/status")
+    except AoscxSessionError:
+        return {}
+    return status if isinstance(status, dict) else {}
+
+
+def wait_firmware_status(module, session, timeout, previous):
+    """Polls firmware/status until the switch reports the end of this installation.
+
+    firmware/status keeps the result of the last installation: a final status
+    with the same (status, date) as `previous`, read before the upload, is the
+    result of an earlier upload and is only accepted once the switch has
+    reported another state in between. The date has a one second resolution,
+    a different status within the same second is therefore a new result. The
+    switch date is compared with itself, not with the controller clock.
+    """
+    stale = previous if previous.get("status") in FINAL_STATUSES else None
+    deadline = time.time() + timeout
+    status = {}
+    while time.time() < deadline:
+        status = read_firmware_status(session)
+        if status.get("status") in FINAL_STATUSES:
+            if stale is None or (status.get("status"), status.get("date")) != (stale.get("status"), stale.get("date")):
+                return status
+        elif status:
+            # In progress (or reset): the next final status belongs to this upload
+            stale = None
+        time.sleep(STATUS_POLL_INTERVAL)
+    module.fail_json(msg=f"Timeout after {timeout}s waiting for the firmware installation", firmware_status=status)
+
+
+def main():
+    """Main module execution."""
+
+    module_args = dict(
+        host=dict(type="str", required=True),
+        port=dict(type="int", required=False),
+        username=dict(type="str", required=True),
+        password=dict(type="str", required=True, no_log=True),
+        partition_name=dict(type="str", required=True, choices=["primary", "secondary"]),
+        firmware_file_path=dict(type="path", required=True),
+        checksum=dict(type="str", required=False),
+        checksum_algorithm=dict(type="str", default="sha256"),
+        chunk_size=dict(type="int", default=4194304),
+        wait_firmware_upload=dict(type="bool", default=True),
+        wait_timeout=dict(type="int", default=600),
+        api_version=dict(type="str", default="v10.09"),
+        use_ssl=dict(type="bool", default=True),
+        validate_certs=dict(type="bool", default=False),
+        timeout=dict(type="int", default=300),
+        session_cache_dir=dict(type="path", default="~/.ansible/aoscx_sessions"),
+        session_ttl=dict(type="int", default=600),
+        progress_events=dict(type="str", required=False),
+        progress_host=dict(type="str", required=False),
+        progress_interval=dict(type="float", default=2.0),
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=False
+    )
+
+    if not HAS_SESSION_UTILS:
+        module.fail_json(
+            msg="Could not import aoscx_session module. "
+                "Ensure the aoscx_session.py file is in the module_utils directory."
+        )
+
+    firmware_file_path = module.params["firmware_file_path"]
+    if not os.path.isfile(firmware_file_path):
+        module.fail_json(msg=f"Firmware file {firmware_file_path} not found")
+
+    algorithm = module.params["checksum_algorithm"]
+    checksum = module.params["checksum"]
+    if checksum and ":" in checksum:
+        algorithm, checksum = checksum.split(":", 1)
+
+    size = os.path.getsize(firmware_file_path)
+    session = session_from_params(module.params)
+    events = ProgressEmitter(module.params["progress_events"], module.params["progress_host"] or module.params["host"],
+                             module.params["progress_interval"])
+    previous_status = read_firmware_status(session) if module.params["wait_firmware_upload"] else {}
+    events.emit("upload_start", partition=module.params["partition_name"], total_bytes=size)
+    started = time.time()
+    try:
+        status, content, digest = session.upload(
+            "firmware?image={0}".format(module.params["partition_name"]),
+            firmware_file_path,
+            checksum=checksum,
+            checksum_algorithm=algorithm,
+            chunk_size=module.params["chunk_size"],
+            progress=lambda sent: events.throttled("upload_progress", bytes=sent, total_bytes=size,
+                                                   elapsed=round(time.time() - started, 1)),
+        )
+    except (AoscxSessionError, ValueError) as e:
+        events.emit("upload_end", status="failed", total_bytes=size, duration=round(time.time() - started, 1), msg=str(e))
+        module.fail_json(msg=str(e), size=size, duration=round(time.time() - started, 1))
+
+    duration = round(time.time() - started, 1)
+    events.emit("upload_end", status="ok", bytes=size, total_bytes=size, duration=duration)
+    result = dict(
+        changed=True,
+        status=status,
+        checksum=digest,
+        size=size,
+        duration=duration,
+        throughput_mbps=round(size / 1048576.0 / max(duration, 0.1), 1),
+    )
+
+    if module.params["wait_firmware_upload"]:
+        result["firmware_status"] = wait_firmware_status(module, session, module.params["wait_timeout"],
+                                                           previous_status)
+        if result["firmware_status"].get("status") != "success":
+            module.fail_json(msg="The switch rejected the firmware image: {0}".format(
+                result["firmware_status"].get("reason") or result["firmware_status"]), **result)
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
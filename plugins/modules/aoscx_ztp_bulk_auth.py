@@ -0,0 +1,221 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: aoscx_ztp_bulk_auth
+version_added: "1.0.0"
+short_description: Configure authentication on many factory-reset Aruba AOSCX switches with retries
+description:
+  - Runs the same SSH exchange as M(aoscx_ztp_auth) for a list of factory-reset switches
+  - Switches are processed by a bounded pool of workers
+  - Each failed attempt is classified as retry-soon (SSH not ready, switch still booting),
+    retry-later (switch unreachable, no password prompt) or permanent (password already set,
+    unknown hostname)
+  - Retryable switches go back on a delay queue with exponential backoff and jitter while
+    the other switches keep being processed
+  - Run it once on the controller (C(run_once) and C(delegate_to: localhost))
+author:
+  - Aruba Manager Team
+options:
+  switches:
+    description:
+      - Switches to configure
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - Key of the switch in the results, defaults to I(hostname)
+        type: str
+      hostname:
+        description:
+          - The IP address or hostname of the target switch
+        required: true
+        type: str
+      username:
+        description:
+          - The username to configure on the switch, defaults to I(username)
+        type: str
+      password:
+        description:
+          - The new password for this switch, defaults to I(password)
+        type: str
+  username:
+    description:
+      - Default username for the switches
+    type: str
+    default: admin
+  password:
+    description:
+      - Default new password for the switches
+    type: str
+  workers:
+    description:
+      - Maximum number of switches being configured at the same time
+    type: int
+    default: 10
+  max_attempts:
+    description:
+      - Maximum number of attempts per switch
+    type: int
+    default: 10
+  retry_soon_delay:
+    description:
+      - Base delay in seconds before retrying a retry-soon failure, doubled at each attempt
+    type: int
+    default: 10
+  retry_later_delay:
+    description:
+      - Base delay in seconds before retrying a retry-later failure, doubled at each attempt
+    type: int
+    default: 60
+  max_delay:
+    description:
+      - Upper bound of the retry delay in seconds
+    type: int
+    default: 300
+  deadline:
+    description:
+      - Time in seconds after which no new attempt is started
+    type: int
+    default: 1800
+notes:
+  - This module requires the paramiko Python library
+  - The module fails when at least one switch could not be configured, I(switch_results) tells which
+requirements:
+  - paramiko
+"""
+
+EXAMPLES = r"""
+- name: Configure authentication on every factory switch of the play
+  aoscx_ztp_bulk_auth:
+    switches: "{{ ansible_play_hosts | map('extract', hostvars, 'ztp_switch') | list }}"
+    workers: 20
+    deadline: 2400
+  register: ztp_bulk
+  run_once: true
+  delegate_to: localhost
+
+- name: Same password for a whole rack being installed
+  aoscx_ztp_bulk_auth:
+    switches:
+      - hostname: 10.20.1.50
+      - hostname: 10.20.1.51
+    password: "{{ switch_password }}"
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+switch_results:
+  description:
+    - Outcome per switch, keyed by name
+    - Not named C(results), a key Ansible reserves for loop results and renames
+  returned: always
+  type: dict
+  sample: {"switch01": {"status": "configured", "attempts": 3, "elapsed": 74.2,
+           "msg": "Authentication configured after 3 attempt(s)",
+           "history": [{"attempt": 1, "failure_class": "retry_soon", "msg": "...", "time": 0.1}]}}
+configured:
+  description: Names of the switches configured
+  returned: always
+  type: list
+  sample: ["switch01"]
+failed:
+  description: Names of the switches given up
+  returned: always
+  type: list
+  sample: []
+"""
+
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+
+try:
+    from ansible.module_utils.aoscx_ztp import (HAS_PARAMIKO_LIB, PARAMIKO_IMP_ERR, ZtpRetryQueue,
+                                                configure_ztp_device)
+    HAS_ZTP_UTILS = True
+except ImportError:
+    HAS_ZTP_UTILS = False
+
+
+def main():
+    """Main module execution."""
+
+    module_args = dict(
+        switches=dict(type="list", elements="dict", required=True, options=dict(
+            name=dict(type="str"),
+            hostname=dict(type="str", required=True),
+            username=dict(type="str"),
+            password=dict(type="str", no_log=True),
+        )),
+        username=dict(type="str", default="admin"),
+        password=dict(type="str", no_log=True),
+        workers=dict(type="int", default=10),
+        max_attempts=dict(type="int", default=10),
+        retry_soon_delay=dict(type="int", default=10),
+        retry_later_delay=dict(type="int", default=60),
+        max_delay=dict(type="int", default=300),
+        deadline=dict(type="int", default=1800),
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=False
+    )
+
+    if not HAS_ZTP_UTILS:
+        module.fail_json(
+            msg="Could not import aoscx_ztp module. "
+                "Ensure the aoscx_ztp.py file is in the module_utils directory."
+        )
+    if not HAS_PARAMIKO_LIB:
+        module.fail_json(msg=missing_required_lib("paramiko"), exception=PARAMIKO_IMP_ERR)
+
+    queue = ZtpRetryQueue(
+        configure_ztp_device,
+        workers=module.params["workers"],
+        max_attempts=module.params["max_attempts"],
+        retry_soon_delay=module.params["retry_soon_delay"],
+        retry_later_delay=module.params["retry_later_delay"],
+        max_delay=module.params["max_delay"],
+        deadline=module.params["deadline"],
+    )
+
+    for switch in module.params["switches"]:
+        password = switch["password"] or module.params["password"]
+        if not password:
+            module.fail_json(msg=f"No password given for switch {switch['hostname']}")
+        queue.add(switch["name"] or switch["hostname"], switch["hostname"],
+                  switch["username"] or module.params["username"], password)
+
+    results = queue.run()
+    configured = sorted(name for name, result in results.items() if result["status"] == "configured")
+    failed = sorted(name for name, result in results.items() if result["status"] != "configured")
+
+    result = dict(
+        changed=bool(configured),
+        switch_results=results,
+        configured=configured,
+        failed=failed,
+    )
+
+    if failed:
+        module.fail_json(
+            msg=f"Failed to configure authentication on {len(failed)} switch(es): {', '.join(failed)}",
+            **result
+        )
+
+    result["msg"] = f"Successfully configured authentication on {len(configured)} switch(es)"
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,13 +21,10 @@ import logging
 import re
 from pathlib import Path
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+CHECKSUM_CHUNK_SIZE = 4 * 1024 * 1024
+
 class ArubaFirmwareValidator:
     """Validateur pour les fichiers firmware Aruba AOS-CX."""
     
@@ -148,9 +145,12 @@ class ArubaFirmwareValidator:
             hash_func = hashlib.new(algorithm)
             
             with open(self.firmware_path, 'rb') as f:
-                # Lire par chunks pour économiser la mémoire
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hash_func.update(chunk)
+                # Blocs de 4 Mo lus dans un tampon réutilisé: mémoire bornée sans
+                # des dizaines de milliers d'appels read() pour une image de 500 Mo
+                buffer = bytearray(CHECKSUM_CHUNK_SIZE)
+                view = memoryview(buffer)
+                for size in iter(lambda: f.readinto(buffer), 0):
+                    hash_func.update(view[:size])
             
             checksum = hash_func.hexdigest()
             
@@ -381,9 +381,12 @@ Exemples d'utilisation:
     
     args = parser.parse_args()
     
-    # Configuration du logging selon les options
-    if args.quiet:
-        logging.getLogger().setLevel(logging.ERROR)
+    # Configuration du logging selon les options (ici et non à l'import, pour
+    # ne pas modifier le logging d'un programme qui importe le validateur)
+    logging.basicConfig(
+        level=logging.ERROR if args.quiet else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     
     # Validation du fichier
     validator = ArubaFirmwareValidator(args.firmware_file)
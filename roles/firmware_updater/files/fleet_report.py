@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fleet Report for Aruba AOS-CX firmware updates
+
+Ce script consolide les résultats de mise à jour firmware de toute la flotte.
+Chaque switch écrit un enregistrement JSON compact (un fichier par hôte ou une
+ligne par hôte dans un fichier JSONL); le script lit ces enregistrements un par
+un et ne conserve que des agrégats de taille bornée (compteurs, statistiques
+de durée, échantillon de valeurs), la mémoire utilisée ne dépend donc pas de
+la taille de la flotte.
+
+Usage:
+    python fleet_report.py --input /reports/firmware_fleet/20250101_120000 \\
+        --output-prefix /reports/firmware_fleet/20250101_120000/fleet_report
+
+Auteur: Aruba Manager Team
+"""
+
+import argparse
+import heapq
+import html
+import json
+import os
+import random
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+
+SUCCESS_STATUSES = ('completed', 'dry_run_completed', 'up_to_date', 'skipped')
+DURATION_FIELDS = ('total', 'backup', 'upload', 'reboot', 'verification')
+RESERVOIR_SIZE = 1024
+MAX_LISTED_FAILURES = 50
+MAX_LISTED_SLOWEST = 10
+
+
+def to_seconds(value):
+    """Convertir une durée (int, float ou chaîne rendue par Jinja) en secondes, None si absente."""
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class DurationStats:
+    """Statistiques de durée en flux: compteur, somme, min, max et réservoir pour les percentiles."""
+
+    def __init__(self, seed=0):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.sample = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        """Ajouter une durée (en secondes)."""
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if len(self.sample) < RESERVOIR_SIZE:
+            self.sample.append(value)
+        else:
+            index = self._random.randrange(self.count)
+            if index < RESERVOIR_SIZE:
+                self.sample[index] = value
+
+    def percentile(self, ratio):
+        """Percentile approché à partir du réservoir."""
+        if not self.sample:
+            return None
+        ordered = sorted(self.sample)
+        return ordered[min(len(ordered) - 1, int(ratio * len(ordered)))]
+
+    def to_dict(self):
+        """Représentation sérialisable."""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 1),
+            'min': round(self.minimum, 1),
+            'p50': round(self.percentile(0.50), 1),
+            'p95': round(self.percentile(0.95), 1),
+            'max': round(self.maximum, 1),
+        }
+
+
+class FleetReport:
+    """Agrégation en flux des enregistrements de résultat par switch."""
+
+    def __init__(self):
+        self.total = 0
+        self.invalid = 0
+        self.statuses = Counter()
+        self.failures_by_stage = Counter()
+        self.models = defaultdict(lambda: {'hosts': 0, 'success': 0,
+                                           'durations': {f: DurationStats() for f in DURATION_FIELDS}})
+        self.versions_after = Counter()
+        self.failures = []
+        self._slowest = []
+
+    def add(self, record):
+        """Intégrer un enregistrement de résultat d'un switch."""
+        self.total += 1
+        status = record.get('status') or 'unknown'
+        success = status in SUCCESS_STATUSES
+        self.statuses[status] += 1
+
+        model = self.models[record.get('model') or 'unknown']
+        model['hosts'] += 1
+        if success:
+            model['success'] += 1
+
+        durations = record.get('durations') or {}
+        for field in DURATION_FIELDS:
+            value = to_seconds(durations.get(field))
+            if value is not None:
+                model['durations'][field].add(value)
+
+        if record.get('version_after'):
+            self.versions_after[record['version_after']] += 1
+
+        if not success:
+            stage = record.get('failed_stage') or 'unknown'
+            self.failures_by_stage[stage] += 1
+            if len(self.failures) < MAX_LISTED_FAILURES:
+                self.failures.append({
+                    'host': record.get('host'),
+                    'model': record.get('model'),
+                    'status': status,
+                    'stage': stage,
+                    'error': (record.get('error') or '')[:200],
+                })
+
+        total_duration = to_seconds(durations.get('total'))
+        if total_duration is not None:
+            entry = (total_duration, record.get('host') or '', record.get('model') or '')
+            if len(self._slowest) < MAX_LISTED_SLOWEST:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    def summary(self):
+        """Résumé sérialisable de la flotte."""
+        success = sum(self.statuses[s] for s in SUCCESS_STATUSES)
+        return {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'hosts': self.total,
+            'invalid_records': self.invalid,
+            'success': success,
+            'failed': self.total - success,
+            'success_rate': round(100.0 * success / self.total, 1) if self.total else 0.0,
+            'statuses': dict(self.statuses.most_common()),
+            'failures_by_stage': dict(self.failures_by_stage.most_common()),
+            'versions_after': dict(self.versions_after.most_common()),
+            'models': {
+                name: {
+                    'hosts': entry['hosts'],
+                    'success': entry['success'],
+                    'success_rate': round(100.0 * entry['success'] / entry['hosts'], 1),
+                    'durations': {f: stats.to_dict() for f, stats in entry['durations'].items()},
+                }
+                for name, entry in sorted(self.models.items())
+            },
+            'slowest_hosts': [
+                {'host': host, 'model': model, 'total_seconds': duration}
+                for duration, host, model in sorted(self._slowest, reverse=True)
+            ],
+            'failures': self.failures,
+            'failures_truncated': max(0, (self.total - success) - len(self.failures)),
+        }
+
+
+def iter_records(paths):
+    """Lire les enregistrements un par un (fichiers .json, .jsonl ou répertoires).
+
+    Les répertoires sont parcourus au fil de os.scandir, sans lister ni trier
+    leurs fichiers: l'ordre ne change pas les agrégats.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(('.json', '.jsonl')) \
+                            and not entry.name.startswith('fleet_report'):
+                        yield from iter_records([entry.path])
+        elif path.endswith('.jsonl'):
+            with open(path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line
+        else:
+            with open(path, 'r') as f:
+                yield f.read()
+
+
+def render_markdown(summary):
+    """Générer le rapport Markdown consolidé."""
+    lines = [
+        "# Rapport de Flotte - Mise à Jour Firmware",
+        "",
+        f"Généré le {summary['generated_at']}",
+        "",
+        "## Synthèse",
+        "",
+        "| Indicateur | Valeur |",
+        "|------------|--------|",
+        f"| **Switches traités** | {summary['hosts']} |",
+        f"| **Succès** | {summary['success']} |",
+        f"| **Échecs** | {summary['failed']} |",
+        f"| **Taux de succès** | {summary['success_rate']}% |",
+        "",
+        "## Échecs par étape",
+        "",
+        "| Étape | Échecs |",
+        "|-------|--------|",
+    ]
+    lines += [f"| {stage} | {count} |" for stage, count in summary['failures_by_stage'].items()] or ["| - | 0 |"]
+    lines += [
+        "",
+        "## Durées par modèle (secondes)",
+        "",
+        "| Modèle | Switches | Succès | Total moy. | Total p95 | Upload moy. | Reboot moy. |",
+        "|--------|----------|--------|------------|-----------|-------------|-------------|",
+    ]
+    for name, model in summary['models'].items():
+        durations = model['durations']
+        lines.append(
+            f"| {name} | {model['hosts']} | {model['success_rate']}% | {durations['total'].get('mean', '-')} | "
+            f"{durations['total'].get('p95', '-')} | {durations['upload'].get('mean', '-')} | "
+            f"{durations['reboot'].get('mean', '-')} |"
+        )
+    lines += ["", "## Versions après mise à jour", "", "| Version | Switches |", "|---------|----------|"]
+    lines += [f"| {version} | {count} |" for version, count in summary['versions_after'].items()] or ["| - | 0 |"]
+    if summary['slowest_hosts']:
+        lines += ["", "## Switches les plus lents", "", "| Switch | Modèle | Durée (s) |", "|--------|--------|-----------|"]
+        lines += [f"| {e['host']} | {e['model']} | {e['total_seconds']} |" for e in summary['slowest_hosts']]
+    if summary['failures']:
+        lines += ["", "## Détail des échecs", "", "| Switch | Modèle | Statut | Étape | Erreur |",
+                  "|--------|--------|--------|-------|--------|"]
+        lines += [f"| {f['host']} | {f['model']} | {f['status']} | {f['stage']} | {f['error'].replace('|', '/')} |"
+                  for f in summary['failures']]
+        if summary['failures_truncated']:
+            lines.append(f"\n... et {summary['failures_truncated']} autres échecs (voir le rapport JSON des hôtes)")
+    lines += ["", "---", "", "**Rapport de flotte généré par Ansible Firmware Updater**", ""]
+    return "\n".join(lines)
+
+
+def render_html(summary):
+    """Générer le rapport HTML consolidé (autonome, sans dépendance)."""
+    def table(headers, rows):
+        head = "".join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+        body = "".join("<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in row) + "</tr>" for row in rows)
+        return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+    sections = [
+        "<h2>Synthèse</h2>",
+        table(["Indicateur", "Valeur"], [
+            ["Switches traités", summary['hosts']], ["Succès", summary['success']],
+            ["Échecs", summary['failed']], ["Taux de succès", f"{summary['success_rate']}%"],
+        ]),
+        "<h2>Échecs par étape</h2>",
+        table(["Étape", "Échecs"], summary['failures_by_stage'].items()),
+        "<h2>Durées par modèle (secondes)</h2>",
+        table(["Modèle", "Switches", "Succès", "Total moy.", "Total p95", "Upload moy.", "Reboot moy."], [
+            [name, m['hosts'], f"{m['success_rate']}%", m['durations']['total'].get('mean', '-'),
+             m['durations']['total'].get('p95', '-'), m['durations']['upload'].get('mean', '-'),
+             m['durations']['reboot'].get('mean', '-')]
+            for name, m in summary['models'].items()
+        ]),
+        "<h2>Switches les plus lents</h2>",
+        table(["Switch", "Modèle", "Durée (s)"],
+              [[e['host'], e['model'], e['total_seconds']] for e in summary['slowest_hosts']]),
+        "<h2>Détail des échecs</h2>",
+        table(["Switch", "Modèle", "Statut", "Étape", "Erreur"],
+              [[f['host'], f['model'], f['status'], f['stage'], f['error']] for f in summary['failures']]),
+    ]
+    return (
+        "<!DOCTYPE html><html lang=\"fr\"><head><meta charset=\"utf-8\">"
+        "<title>Rapport de flotte firmware</title><style>"
+        "body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1.5em}"
+        "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left}th{background:#eee}"
+        "</style></head><body>"
+        f"<h1>Rapport de Flotte - Mise à Jour Firmware</h1><p>Généré le {html.escape(summary['generated_at'])}</p>"
+        + "".join(sections) + "</body></html>\n"
+    )
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(
+        description="Consolider les résultats de mise à jour firmware de la flotte"
+    )
+    parser.add_argument('--input', nargs='+', required=True,
+                        help='Répertoires ou fichiers (.json par hôte, .jsonl) de résultats')
+    parser.add_argument('--output-prefix', required=True,
+                        help='Préfixe des fichiers générés (ex: /tmp/fleet_report)')
+    parser.add_argument('--formats', nargs='+', choices=['markdown', 'json', 'html'],
+                        default=['markdown', 'json', 'html'], help='Formats à générer')
+    args = parser.parse_args()
+
+    report = FleetReport()
+    for raw in iter_records(args.input):
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            report.invalid += 1
+            continue
+        if isinstance(record, dict):
+            report.add(record)
+        else:
+            report.invalid += 1
+
+    summary = report.summary()
+    extensions = {'markdown': '.md', 'json': '.json', 'html': '.html'}
+    for output_format in args.formats:
+        path = args.output_prefix + extensions[output_format]
+        with open(path, 'w') as f:
+            if output_format == 'markdown':
+                f.write(render_markdown(summary))
+            elif output_format == 'json':
+                json.dump(summary, f, indent=2)
+            else:
+                f.write(render_html(summary))
+
+    print(json.dumps({
+        'hosts': summary['hosts'],
+        'success_rate': summary['success_rate'],
+        'failures_by_stage': summary['failures_by_stage'],
+        'outputs': [args.output_prefix + extensions[f] for f in args.formats],
+    }))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
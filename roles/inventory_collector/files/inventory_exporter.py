@@ -14,6 +14,9 @@ Arguments:
     input_file:  Chemin vers le fichier JSON contenant les données d'inventaire
     output_file: Chemin vers le fichier Excel de sortie
 
+openpyxl n'est importé qu'au moment de créer le classeur: une erreur
+d'arguments ou de lecture du JSON sort sans payer son coût d'import.
+
 Auteur: [Votre nom]
 Date: [Date de création]
 """
@@ -21,20 +24,13 @@ Date: [Date de création]
 import json
 import sys
 import os
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
 import logging
 from datetime import datetime
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+COLLECT_FAILED = "ÉCHEC DE COLLECTE"
+
 class ArubaSwitchInventoryExporter:
     """Classe pour exporter l'inventaire des switches Aruba vers Excel."""
     
@@ -85,12 +81,17 @@ class ArubaSwitchInventoryExporter:
             return False
         
         try:
-            # Créer DataFrame pandas
-            df = pd.DataFrame(self.data)
-            
-            # Réorganiser et renommer les colonnes
-            df = df[[col for col in self.column_mapping.keys() if col in df.columns]]
-            df = df.rename(columns=self.column_mapping)
+            from openpyxl import Workbook
+            from openpyxl.styles import Font, Alignment, PatternFill
+            from openpyxl.utils import get_column_letter
+
+            # Colonnes connues présentes dans au moins un équipement, dans l'ordre du mapping
+            present = set()
+            for device in self.data:
+                present.update(device)
+            keys = [key for key in self.column_mapping if key in present]
+            columns = [self.column_mapping[key] for key in keys]
+            rows = [[device.get(key) for key in keys] for device in self.data]
             
             # Créer workbook et feuille
             wb = Workbook()
@@ -98,7 +99,7 @@ class ArubaSwitchInventoryExporter:
             ws.title = "Inventaire Aruba"
             
             # Ajouter les en-têtes
-            for col_idx, column_name in enumerate(df.columns, start=1):
+            for col_idx, column_name in enumerate(columns, start=1):
                 cell = ws.cell(row=1, column=col_idx)
                 cell.value = column_name
                 cell.font = Font(bold=True)
@@ -106,29 +107,29 @@ class ArubaSwitchInventoryExporter:
                 cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
             
             # Ajouter les données
-            for row_idx, row in enumerate(df.values, start=2):
+            for row_idx, row in enumerate(rows, start=2):
                 for col_idx, value in enumerate(row, start=1):
                     cell = ws.cell(row=row_idx, column=col_idx)
                     cell.value = value
                     cell.alignment = Alignment(horizontal='left')
                     
                     # Mettre en évidence les échecs de collecte
-                    if value == "ÉCHEC DE COLLECTE":
+                    if value == COLLECT_FAILED:
                         cell.fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
             
             # Ajuster la largeur des colonnes
-            for col_idx, column_name in enumerate(df.columns, start=1):
+            for col_idx, column_name in enumerate(columns, start=1):
                 width = self.column_widths.get(column_name, 15)
                 ws.column_dimensions[get_column_letter(col_idx)].width = width
             
             # Ajouter une ligne d'information récapitulative
-            total_row = len(df) + 3
+            total_row = len(rows) + 3
             ws.cell(row=total_row, column=1).value = "Total des équipements :"
             ws.cell(row=total_row, column=1).font = Font(bold=True)
-            ws.cell(row=total_row, column=2).value = len(df)
+            ws.cell(row=total_row, column=2).value = len(rows)
             
-            success_count = sum(1 for row in df.values if "ÉCHEC DE COLLECTE" not in row)
-            failure_count = len(df) - success_count
+            success_count = sum(1 for row in rows if COLLECT_FAILED not in row)
+            failure_count = len(rows) - success_count
             
             ws.cell(row=total_row+1, column=1).value = "Collectes réussies :"
             ws.cell(row=total_row+1, column=1).font = Font(bold=True)
@@ -160,6 +161,12 @@ class ArubaSwitchInventoryExporter:
 
 def main():
     """Point d'entrée principal du script."""
+    # Configuration du logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
     # Vérifier les arguments
     if len(sys.argv) != 3:
         print(f"Usage: {sys.argv[0]} input_file output_file")
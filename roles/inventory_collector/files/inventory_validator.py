@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aruba Inventory Validator
+
+Ce script valide les données d'inventaire consolidées des équipements Aruba.
+Les index (numéros de série, adresses IP, noms, versions par modèle) sont
+construits en un seul passage sur la liste, le coût reste linéaire quelle
+que soit la taille de l'inventaire.
+
+Contrôles effectués:
+    - collectes échouées (données manquantes)
+    - numéros de série en doublon
+    - adresses IP en doublon
+    - collisions de noms d'hôte (insensibles à la casse)
+    - modèles inconnus (hors séries 6000/8000)
+    - versions minoritaires par modèle
+
+Usage:
+    python inventory_validator.py input_file [--output report.json] [--fail-on CHECK ...]
+
+Le rapport JSON est écrit sur la sortie standard (et dans --output si indiqué).
+
+Auteur: Aruba Manager Team
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+COLLECT_FAILED = 'ÉCHEC DE COLLECTE'
+PLACEHOLDERS = {'', 'N/A', 'Unknown', COLLECT_FAILED}
+MODEL_PATTERN = re.compile(r'(6[0-9]{3}|8[0-9]{3})')
+CHECKS = ('missing_data', 'duplicate_serials', 'duplicate_ips', 'hostname_collisions',
+          'unknown_models', 'version_outliers')
+
+
+class ArubaInventoryValidator:
+    """Classe pour valider l'inventaire consolidé des switches Aruba."""
+
+    def __init__(self, data):
+        """
+        Initialiser le validateur avec les données d'inventaire.
+
+        Args:
+            data (list): Liste des équipements (dictionnaires issus de la collecte)
+        """
+        self.data = data
+
+    @staticmethod
+    def _host(device):
+        return device.get('inventaire_hote') or device.get('adresse_ip') or device.get('nom_switch', '')
+
+    @staticmethod
+    def _duplicates(groups, originals):
+        """Groupes de plus d'un hôte, indexés par la valeur telle que collectée."""
+        return {originals[key]: hosts for key, hosts in groups.items() if len(hosts) > 1}
+
+    def validate(self):
+        """
+        Exécuter tous les contrôles en un seul passage.
+
+        Returns:
+            dict: Rapport de validation (résumé et détail par contrôle)
+        """
+        missing = []
+        # Regroupement sur la valeur normalisée, le rapport garde la valeur
+        # d'origine (première rencontrée)
+        serials = defaultdict(list)
+        serial_originals = {}
+        addresses = defaultdict(list)
+        names = defaultdict(list)
+        name_originals = {}
+        unknown_models = []
+        versions = defaultdict(Counter)
+        model_of = []
+
+        for device in self.data:
+            host = self._host(device)
+            if device.get('modele') == COLLECT_FAILED:
+                # Enregistrement complet, comme missing_data_devices avant le validateur
+                missing.append(device)
+                model_of.append(None)
+                continue
+
+            serial = str(device.get('serial', '')).strip()
+            if serial not in PLACEHOLDERS:
+                serials[serial.upper()].append(host)
+                serial_originals.setdefault(serial.upper(), serial)
+
+            address = device.get('ansible_host') or device.get('adresse_ip', '')
+            if address not in PLACEHOLDERS:
+                addresses[address].append(host)
+
+            name = str(device.get('nom_switch', '')).strip()
+            if name not in PLACEHOLDERS:
+                names[name.lower()].append(host)
+                name_originals.setdefault(name.lower(), name)
+
+            match = MODEL_PATTERN.search('{0} {1}'.format(device.get('modele', ''),
+                                                          device.get('product_description', '')))
+            model = match.group(1) if match else None
+            model_of.append(model)
+            if model is None:
+                unknown_models.append({'host': host, 'modele': device.get('modele', '')})
+            elif device.get('version_os') not in PLACEHOLDERS:
+                versions[model][device['version_os']] += 1
+
+        # Version majoritaire par modèle (à égalité, la plus récente)
+        expected = {
+            model: max(counts.items(), key=lambda item: (item[1], item[0]))[0]
+            for model, counts in versions.items()
+        }
+        outliers = [
+            {'host': self._host(device), 'model': model,
+             'version': device.get('version_os'), 'expected': expected[model]}
+            for device, model in zip(self.data, model_of)
+            if model in expected and device.get('version_os') not in PLACEHOLDERS
+            and device.get('version_os') != expected[model]
+        ]
+
+        report = {
+            'missing_data': missing,
+            'duplicate_serials': self._duplicates(serials, serial_originals),
+            'duplicate_ips': {k: v for k, v in addresses.items() if len(v) > 1},
+            'hostname_collisions': self._duplicates(names, name_originals),
+            'unknown_models': unknown_models,
+            'version_outliers': outliers,
+            'expected_versions': expected,
+        }
+        report['summary'] = {
+            'total': len(self.data),
+            'collected': len(self.data) - len(missing),
+            **{check: len(report[check]) for check in CHECKS},
+        }
+        return report
+
+
+def main():
+    """Point d'entrée principal du script."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Valider l'inventaire consolidé des switches Aruba")
+    parser.add_argument('input_file', help="Fichier JSON d'inventaire consolidé")
+    parser.add_argument('--output', help='Fichier JSON où écrire le rapport')
+    parser.add_argument('--fail-on', nargs='+', choices=CHECKS, default=[],
+                        help='Contrôles bloquants (code retour 2 si au moins une anomalie)')
+    args = parser.parse_args()
+
+    try:
+        with open(args.input_file, 'r') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        logger.error(f"Erreur lors du chargement des données: {str(e)}")
+        sys.exit(1)
+
+    report = ArubaInventoryValidator(data).validate()
+    logger.info("Validation terminée: %s", ', '.join(f"{k}={v}" for k, v in report['summary'].items()))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    json.dump(report, sys.stdout, ensure_ascii=False)
+    sys.stdout.write('\n')
+
+    blocking = [check for check in args.fail_on if report['summary'][check]]
+    if blocking:
+        logger.error(f"Contrôles bloquants en échec: {', '.join(blocking)}")
+        sys.exit(2)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Suivi en temps réel des opérations sur la flotte Aruba
+
+Ce script lit le flux d'événements écrit par le plugin de callback
+progress_events (fichier JSONL suivi comme `tail -f`, ou socket Unix en
+datagrammes) et affiche en continu:
+    - l'avancement de la flotte (switches terminés, en échec, injoignables)
+    - le débit (switches/minute, Mo/s d'upload firmware) et l'ETA
+    - les retardataires: switches restés dans une étape bien plus longtemps
+      que la médiane des autres switches, ou sans événement depuis --stall s
+
+Un lot bloqué est ainsi visible dès qu'il décroche, sans attendre
+l'expiration des timeouts du rôle.
+
+Usage:
+    python scripts/aruba_progress.py progress/events.jsonl
+    python scripts/aruba_progress.py unix:/tmp/aruba_progress.sock
+    python scripts/aruba_progress.py progress/events.jsonl --once --json
+
+Auteur: Aruba Manager Team
+"""
+
+import argparse
+import json
+import logging
+import os
+import select
+import socket
+import statistics
+import sys
+import time
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PREFIX = 'unix:'
+THROUGHPUT_WINDOW = 30  # Fenêtre (s) du débit d'upload instantané
+
+
+class HostState:
+    """État courant d'un switch reconstruit à partir des événements."""
+
+    __slots__ = ('name', 'stage', 'stage_since', 'last_seen', 'done', 'failed', 'unreachable',
+                 'upload_bytes', 'upload_total', 'last_milestone')
+
+    def __init__(self, name):
+        self.name = name
+        self.stage = None
+        self.stage_since = None
+        self.last_seen = None
+        self.done = False
+        self.failed = False
+        self.unreachable = False
+        self.upload_bytes = 0
+        self.upload_total = 0
+        self.last_milestone = None
+
+
+class FleetProgress:
+    """Agrège le flux d'événements d'une exécution en indicateurs de flotte."""
+
+    def __init__(self, straggler_factor=2.0, min_samples=3, min_stage_time=60, stall=600):
+        """
+        Initialiser l'agrégateur.
+
+        Args:
+            straggler_factor (float): Multiple de la durée médiane d'une étape au-delà duquel un switch est retardataire
+            min_samples (int): Nombre de durées terminées nécessaires avant de calculer une médiane
+            min_stage_time (float): Durée minimale (s) dans une étape avant d'être signalé
+            stall (float): Durée (s) sans aucun événement au-delà de laquelle un switch est signalé
+        """
+        self.straggler_factor = straggler_factor
+        self.min_samples = min_samples
+        self.min_stage_time = min_stage_time
+        self.stall = stall
+        self.reset()
+
+    def reset(self, run_id=None, playbook=None, started=None):
+        self.run_id = run_id
+        self.playbook = playbook
+        self.started = started
+        self.ended = None
+        self.hosts = {}
+        self.stage_order = []
+        self.stage_durations = defaultdict(list)
+        self.stage_completions = 0
+        self.upload_samples = deque()
+        self.events = 0
+
+    def host(self, name):
+        state = self.hosts.get(name)
+        if state is None:
+            state = self.hosts[name] = HostState(name)
+        return state
+
+    def feed(self, event):
+        """Intégrer un événement (dictionnaire décodé d'une ligne JSON)."""
+        kind = event.get('event')
+        now = event.get('time', time.time())
+        if kind == 'run_start':
+            self.reset(event.get('run_id'), event.get('playbook'), now)
+        if self.started is None:
+            self.started = now
+        self.events += 1
+
+        if kind == 'play_start':
+            for name in event.get('hosts', []):
+                self.host(name)
+            return
+        if kind == 'run_end':
+            self.ended = now
+            for name, summary in event.get('hosts', {}).items():
+                state = self.host(name)
+                state.done = True
+                state.failed = state.failed or bool(summary.get('failures'))
+                state.unreachable = state.unreachable or bool(summary.get('unreachable'))
+                state.stage = None
+            return
+        if 'host' not in event:
+            return
+
+        state = self.host(event['host'])
+        state.last_seen = now
+        if kind == 'stage_start':
+            state.stage = event.get('stage')
+            state.stage_since = now
+            if state.stage not in self.stage_order:
+                self.stage_order.append(state.stage)
+        elif kind == 'stage_end':
+            if event.get('status') != 'unreachable':
+                self.stage_durations[event.get('stage')].append(event.get('duration', 0))
+            self.stage_completions += 1
+            if state.stage == event.get('stage'):
+                state.stage = None
+                state.stage_since = None
+        elif kind == 'upload_start':
+            state.upload_bytes = 0
+            state.upload_total = event.get('total_bytes', 0)
+        elif kind in ('upload_progress', 'upload_end'):
+            sent = event.get('bytes', state.upload_bytes)
+            self.upload_samples.append((now, max(sent - state.upload_bytes, 0)))
+            state.upload_bytes = sent
+            state.upload_total = event.get('total_bytes', state.upload_total)
+        elif kind == 'host_failed':
+            state.failed = True
+        elif kind == 'host_unreachable':
+            state.unreachable = True
+        elif kind == 'host_done':
+            state.done = True
+            state.stage = None
+        elif kind != 'task_failed':
+            # Jalons déclarés par les rôles (upload_done, reboot_down, reboot_up...)
+            state.last_milestone = kind
+
+    def snapshot(self, now=None):
+        """
+        Calculer les indicateurs courants.
+
+        Returns:
+            dict: Avancement, débit, ETA, étapes en cours et retardataires
+        """
+        now = time.time() if now is None else now
+        reference = now if self.ended is None else self.ended
+        elapsed = max(reference - (reference if self.started is None else self.started), 0.001)
+        hosts = list(self.hosts.values())
+        total = len(hosts)
+        done = sum(1 for h in hosts if h.done)
+        failed = sum(1 for h in hosts if h.failed)
+        unreachable = sum(1 for h in hosts if h.unreachable)
+
+        while self.upload_samples and self.upload_samples[0][0] < now - THROUGHPUT_WINDOW:
+            self.upload_samples.popleft()
+        window_bytes = sum(sent for _, sent in self.upload_samples)
+
+        # Avancement mesuré en étapes terminées: fonctionne aussi quand tous les
+        # switches finissent ensemble (stratégie linear)
+        expected = total * len(self.stage_order)
+        fraction = 1.0 if self.ended else (min(self.stage_completions / expected, 1.0) if expected else 0.0)
+        eta = 0 if fraction >= 1.0 else (elapsed * (1 - fraction) / fraction if fraction > 0 else None)
+
+        medians = {
+            stage: statistics.median(durations)
+            for stage, durations in self.stage_durations.items() if len(durations) >= self.min_samples
+        }
+        in_stage = defaultdict(int)
+        stragglers = []
+        for h in hosts:
+            if h.done or h.stage is None:
+                continue
+            in_stage[h.stage] += 1
+            spent = now - h.stage_since
+            median = medians.get(h.stage)
+            silent = now - h.last_seen if h.last_seen else 0
+            if median is not None and spent >= self.min_stage_time and spent > self.straggler_factor * median:
+                stragglers.append({'host': h.name, 'stage': h.stage, 'seconds': round(spent),
+                                   'median': round(median), 'ratio': round(spent / max(median, 1), 1),
+                                   'last_milestone': h.last_milestone, 'reason': 'lent'})
+            elif silent > self.stall:
+                stragglers.append({'host': h.name, 'stage': h.stage, 'seconds': round(spent),
+                                   'median': round(median) if median is not None else None,
+                                   'ratio': round(silent / self.stall, 1),
+                                   'last_milestone': h.last_milestone, 'reason': 'silencieux'})
+        stragglers.sort(key=lambda s: s['ratio'], reverse=True)
+
+        uploads = [h for h in hosts if h.upload_total and h.upload_bytes < h.upload_total and not h.done]
+        return {
+            'run_id': self.run_id,
+            'playbook': self.playbook,
+            'finished': self.ended is not None,
+            'elapsed': round(elapsed),
+            'hosts': total,
+            'done': done,
+            'failed': failed,
+            'unreachable': unreachable,
+            'progress': round(fraction * 100, 1),
+            'eta': round(eta) if eta is not None else None,
+            'hosts_per_minute': round(done / elapsed * 60, 2),
+            'upload_mbps': round(window_bytes / 1048576.0 / THROUGHPUT_WINDOW, 1),
+            'uploads_in_progress': len(uploads),
+            'stages': [{'stage': stage, 'active': in_stage.get(stage, 0),
+                        'completed': len(self.stage_durations.get(stage, [])),
+                        'median': round(medians[stage]) if stage in medians else None}
+                       for stage in self.stage_order],
+            'stragglers': stragglers,
+        }
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return '--:--'
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return '{0}h{1:02d}m'.format(seconds // 3600, seconds % 3600 // 60)
+    return '{0:02d}:{1:02d}'.format(seconds // 60, seconds % 60)
+
+
+def render(snapshot, max_stragglers=15):
+    """Mettre en forme un instantané pour le terminal."""
+    lines = [
+        "=== {0} (run {1}) {2} ===".format(snapshot['playbook'] or '?', snapshot['run_id'] or '?',
+                                            'TERMINÉ' if snapshot['finished'] else 'EN COURS'),
+        "Écoulé: {0}   ETA: {1}   Avancement: {2}%".format(
+            format_duration(snapshot['elapsed']), format_duration(snapshot['eta']), snapshot['progress']),
+        "Switches: {0} terminés / {1}   échecs: {2}   injoignables: {3}".format(
+            snapshot['done'], snapshot['hosts'], snapshot['failed'], snapshot['unreachable']),
+        "Débit: {0} switches/min   upload: {1} Mo/s ({2} en cours)".format(
+            snapshot['hosts_per_minute'], snapshot['upload_mbps'], snapshot['uploads_in_progress']),
+        "",
+        "{0:<20} {1:>8} {2:>9} {3:>8}".format('Étape', 'En cours', 'Terminés', 'Médiane'),
+    ]
+    for stage in snapshot['stages']:
+        lines.append("{0:<20} {1:>8} {2:>9} {3:>8}".format(
+            stage['stage'], stage['active'], stage['completed'], format_duration(stage['median'])))
+
+    lines.append("")
+    if snapshot['stragglers']:
+        lines.append("Retardataires ({0}):".format(len(snapshot['stragglers'])))
+        for s in snapshot['stragglers'][:max_stragglers]:
+            lines.append("  {0:<24} {1:<14} {2:>7} (médiane {3}, x{4}, {5}, dernier jalon: {6})".format(
+                s['host'], s['stage'], format_duration(s['seconds']), format_duration(s['median']),
+                s['ratio'], s['reason'], s['last_milestone'] or '-'))
+    else:
+        lines.append("Aucun retardataire")
+    return '\n'.join(lines)
+
+
+class FileSource:
+    """Suit un fichier JSONL comme `tail -f` (création tardive et troncature gérées)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+        self.buffer = ''
+
+    def read(self, timeout):
+        if self.handle is None:
+            if not os.path.exists(self.path):
+                time.sleep(timeout)
+                return []
+            self.handle = open(self.path, 'r', encoding='utf-8')
+        elif os.path.getsize(self.path) < self.handle.tell():
+            logger.info("Fichier %s tronqué, relecture depuis le début", self.path)
+            self.handle.seek(0)
+            self.buffer = ''
+
+        data = self.handle.read()
+        if not data:
+            time.sleep(timeout)
+            return []
+        self.buffer += data
+        lines = self.buffer.split('\n')
+        self.buffer = lines.pop()
+        return lines
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+
+
+class SocketSource:
+    """Reçoit les événements envoyés en datagrammes sur une socket Unix."""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(path)
+
+    def read(self, timeout):
+        lines = []
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            ready, _, _ = select.select([self.sock], [], [], max(remaining, 0))
+            if not ready:
+                return lines
+            lines.extend(self.sock.recv(65536).decode('utf-8').splitlines())
+
+    def close(self):
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def consume(source, progress, timeout):
+    """Lire les événements disponibles pendant au plus `timeout` secondes."""
+    for line in source.read(timeout):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            progress.feed(json.loads(line))
+        except ValueError:
+            logger.warning("Ligne ignorée (JSON invalide): %s", line[:120])
+
+
+def main():
+    """Point d'entrée principal du script."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Suivre en temps réel le flux d'événements progress_events")
+    parser.add_argument('source', nargs='?', default=os.environ.get('ARUBA_PROGRESS_EVENTS', 'progress/events.jsonl'),
+                        help="Fichier JSONL ou unix:<chemin> (défaut: $ARUBA_PROGRESS_EVENTS ou progress/events.jsonl)")
+    parser.add_argument('--interval', type=float, default=2.0, help="Période de rafraîchissement (s)")
+    parser.add_argument('--straggler-factor', type=float, default=2.0,
+                        help="Multiple de la durée médiane d'une étape au-delà duquel un switch est retardataire")
+    parser.add_argument('--min-samples', type=int, default=3,
+                        help="Durées terminées nécessaires avant de calculer la médiane d'une étape")
+    parser.add_argument('--min-stage-time', type=float, default=60,
+                        help="Durée minimale (s) dans une étape avant d'être signalé")
+    parser.add_argument('--stall', type=float, default=600, help="Silence (s) au-delà duquel un switch est signalé")
+    parser.add_argument('--once', action='store_true', help="Lire le fichier existant, afficher un instantané et quitter")
+    parser.add_argument('--json', action='store_true', help="Instantané au format JSON (avec --once)")
+    args = parser.parse_args()
+
+    progress = FleetProgress(args.straggler_factor, args.min_samples, args.min_stage_time, args.stall)
+
+    if args.once:
+        if args.source.startswith(SOCKET_PREFIX):
+            parser.error("--once nécessite un fichier JSONL")
+        if not os.path.exists(args.source):
+            logger.error(f"Fichier introuvable: {args.source}")
+            sys.exit(1)
+        source = FileSource(args.source)
+        consume(source, progress, 0)
+        source.close()
+        snapshot = progress.snapshot()
+        print(json.dumps(snapshot, ensure_ascii=False) if args.json else render(snapshot))
+        sys.exit(0)
+
+    if args.source.startswith(SOCKET_PREFIX):
+        source = SocketSource(args.source[len(SOCKET_PREFIX):])
+    else:
+        source = FileSource(args.source)
+    interactive = sys.stdout.isatty()
+
+    try:
+        while True:
+            next_refresh = time.time() + args.interval
+            while time.time() < next_refresh:
+                consume(source, progress, min(0.2, max(next_refresh - time.time(), 0)))
+            output = render(progress.snapshot())
+            if interactive:
+                sys.stdout.write('\033[H\033[J' + output + '\n')
+            else:
+                sys.stdout.write(output + '\n\n')
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+
+
+if __name__ == "__main__":
+    main()
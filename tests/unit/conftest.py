@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Chemins des tests unitaires.
+
+Les module_utils, callbacks et scripts du dépôt ne sont pas installés comme un
+paquet: ils sont importés depuis l'arborescence, comme le fait ansible.cfg.
+"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+for path in ('plugins/module_utils', 'plugins/callback', 'scripts', 'benchmarks'):
+    path = os.path.join(REPO_ROOT, path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+VIEWER = os.path.join(REPO_ROOT, 'scripts', 'aruba_progress.py')
+ANSIBLE_PLAYBOOK = os.path.join(os.path.dirname(sys.executable), 'ansible-playbook')
+
+
+def run_viewer(events_file):
+    result = subprocess.run([sys.executable, VIEWER, str(events_file), '--once', '--json'],
+                            capture_output=True, text=True, check=False)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout), result.stderr
+
+
+@pytest.fixture(scope='module')
+def events_file(tmp_path_factory):
+    if not os.path.exists(ANSIBLE_PLAYBOOK):
+        pytest.skip('ansible-playbook introuvable')
+    work = tmp_path_factory.mktemp('progress')
+    events = work / 'events.jsonl'
+    # Pas l'ansible.cfg du dépôt (inventaire, callbacks): seulement celui du test
+    config = work / 'ansible.cfg'
+    config.write_text('[defaults]\n')
+    env = dict(os.environ,
+               ANSIBLE_CONFIG=str(config),
+               ANSIBLE_CALLBACK_PLUGINS=os.path.join(REPO_ROOT, 'plugins', 'callback'),
+               ANSIBLE_CALLBACKS_ENABLED='progress_events',
+               ARUBA_PROGRESS_EVENTS=str(events),
+               ANSIBLE_PYTHON_INTERPRETER=sys.executable,
+               ANSIBLE_LOCAL_TEMP=str(work / 'tmp'))
+    result = subprocess.run([ANSIBLE_PLAYBOOK, '-i', 'sw1,sw2,', os.path.join(FIXTURES, 'progress_playbook.yml')],
+                            cwd=str(work), env=env, capture_output=True, text=True, check=False)
+    # sw2 échoue volontairement
+    assert result.returncode == 2, result.stdout + result.stderr
+    return events
+
+
+@pytest.fixture(scope='module')
+def events(events_file):
+    with open(str(events_file)) as f:
+        return [json.loads(line) for line in f]
+
+
+def host_events(events, host, kinds):
+    return [(e['event'], e.get('stage'), e.get('status')) for e in events
+            if e.get('host') == host and e['event'] in kinds]
+
+
+def test_run_and_play_events(events):
+    assert events[0]['event'] == 'run_start'
+    assert events[0]['playbook'] == 'progress_playbook.yml'
+    assert events[1]['event'] == 'play_start'
+    assert events[1]['hosts'] == ['sw1', 'sw2']
+    assert events[-1]['event'] == 'run_end'
+    assert events[-1]['hosts']['sw2']['failures'] == 1
+
+
+def test_stages_from_task_names(events):
+    stages = ('stage_start', 'stage_end')
+    # (main) est une étape conteneur: ni ouverte ni fermée
+    assert host_events(events, 'sw1', stages) == [
+        ('stage_start', 'check', None), ('stage_end', 'check', 'ok'),
+        ('stage_start', 'upload', None), ('stage_end', 'upload', 'ok'),
+        ('stage_start', 'report', None), ('stage_end', 'report', 'ok'),
+    ]
+    assert host_events(events, 'sw2', stages) == [
+        ('stage_start', 'check', None), ('stage_end', 'check', 'ok'),
+        ('stage_start', 'upload', None), ('stage_end', 'upload', 'failed'),
+    ]
+    assert all(e['duration'] >= 0 for e in events if e['event'] == 'stage_end')
+
+
+def test_milestones_and_failures(events):
+    milestones = [e for e in events if e['event'] == 'upload_done']
+    assert [e['host'] for e in milestones] == ['sw1', 'sw2']
+    assert milestones[0]['stage'] == 'upload'
+    assert milestones[0]['status'] == 'ok'
+    assert milestones[0]['facts'] == {'sample_uploaded': 'sw1'}
+
+    failures = [e for e in events if e['event'] == 'task_failed']
+    assert len(failures) == 1
+    assert failures[0]['host'] == 'sw2'
+    assert failures[0]['stage'] == 'upload'
+    assert failures[0]['msg'] == 'simulated upload failure'
+
+
+def test_viewer_on_callback_events(events_file):
+    snapshot, _ = run_viewer(events_file)
+    assert snapshot['playbook'] == 'progress_playbook.yml'
+    assert snapshot['finished'] is True
+    assert snapshot['progress'] == 100.0
+    assert (snapshot['hosts'], snapshot['done'], snapshot['failed']) == (2, 2, 1)
+    assert [(s['stage'], s['completed']) for s in snapshot['stages']] == [
+        ('check', 2), ('upload', 2), ('report', 1)]
+    assert snapshot['stragglers'] == []
+
+
+def test_viewer_on_sample_events():
+    snapshot, stderr = run_viewer(os.path.join(FIXTURES, 'progress_events.jsonl'))
+    assert 'JSON invalide' in stderr
+    assert snapshot['finished'] is False
+    assert (snapshot['hosts'], snapshot['done'], snapshot['failed']) == (4, 1, 1)
+    assert snapshot['progress'] == 50.0
+    assert snapshot['uploads_in_progress'] == 1
+    assert snapshot['stages'] == [
+        {'stage': 'upload', 'active': 1, 'completed': 3, 'median': 100},
+        {'stage': 'reboot', 'active': 2, 'completed': 1, 'median': None},
+    ]
+    # sw4 est toujours dans l'upload, bien au-delà de la médiane des autres
+    assert snapshot['stragglers'][0]['host'] == 'sw4'
+    assert snapshot['stragglers'][0]['reason'] == 'lent'
+    assert snapshot['stragglers'][0]['median'] == 100
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import socket
+import time
+
+import pytest
+
+from aoscx_session import AoscxSession, AoscxSessionError
+from mock_aoscx_server import MockFleet
+
+IMAGE_NAME = 'ArubaOS-CX_6400-6300_10_13_1110.swi'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def switch():
+    fleet = MockFleet(1, base_port=free_port(), models=['6300'])
+    fleet.start()
+    yield fleet.switches[0]
+    fleet.stop()
+
+
+@pytest.fixture
+def session(switch, tmp_path):
+    return AoscxSession(switch.address, 'admin', 'admin', port=switch.port, use_ssl=False,
+                        cache_dir=str(tmp_path / 'sessions'))
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / IMAGE_NAME
+    # Plusieurs blocs, le dernier incomplet
+    path.write_bytes(bytes(range(256)) * 4096 * 3 + b'tail')
+    return path
+
+
+def upload_stats(switch):
+    # Les statistiques du mock sont enregistrées après l'envoi de la réponse
+    time.sleep(0.2)
+    return switch.fleet.stats.snapshot()['stages'].get('upload', {})
+
+
+def test_upload_streams_file_with_checksum(switch, session, image):
+    expected = hashlib.sha256(image.read_bytes()).hexdigest()
+    sent = []
+
+    status, _, digest = session.upload('firmware?image=secondary', str(image), checksum=expected.upper(),
+                                       chunk_size=1024 * 1024, progress=sent.append)
+
+    assert status == 200
+    assert digest == expected
+    assert sent == [1024 * 1024, 2 * 1024 * 1024, 3 * 1024 * 1024, image.stat().st_size]
+    assert switch.state.secondary_version.endswith('10.13.1110')
+    assert switch.state.firmware_status['status'] == 'success'
+    stats = upload_stats(switch)
+    assert stats['requests'] == 1
+    assert stats['errors'] == 0
+
+
+def test_upload_aborts_on_checksum_mismatch(switch, session, image):
+    previous = switch.state.secondary_version
+
+    with pytest.raises(AoscxSessionError) as excinfo:
+        session.upload('firmware?image=secondary', str(image), checksum='0' * 64, chunk_size=1024 * 1024)
+
+    assert 'checksum mismatch' in str(excinfo.value)
+    # Requête multipart tronquée: le switch n'applique pas l'image
+    assert switch.state.secondary_version == previous
+    assert switch.state.firmware_status['status'] == 'none'
+    stats = upload_stats(switch)
+    assert stats['requests'] == 1
+    assert stats['errors'] == 1
+    assert stats['bytes'] < image.stat().st_size + 1024
+
+
+def test_upload_rejects_unknown_algorithm(session, image):
+    with pytest.raises(ValueError):
+        session.upload('firmware?image=secondary', str(image), checksum='00', checksum_algorithm='nope')
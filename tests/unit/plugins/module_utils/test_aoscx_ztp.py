@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import socket
+import time
+
+import pytest
+
+import aoscx_ztp
+from aoscx_ztp import (PERMANENT, RETRY_LATER, RETRY_SOON, ZtpError, ZtpRetryQueue,
+                       classify_ztp_failure, configure_ztp_device)
+
+
+@pytest.mark.parametrize('error, expected', [
+    (ConnectionRefusedError(errno.ECONNREFUSED, 'refused'), RETRY_SOON),
+    (ConnectionResetError(errno.ECONNRESET, 'reset'), RETRY_SOON),
+    (socket.timeout('timed out'), RETRY_SOON),
+    (EOFError(), RETRY_SOON),
+    (OSError(errno.ETIMEDOUT, 'timed out'), RETRY_SOON),
+    (OSError(errno.EHOSTUNREACH, 'no route to host'), RETRY_LATER),
+    (OSError(errno.ENETUNREACH, 'network unreachable'), RETRY_LATER),
+    (socket.gaierror(socket.EAI_NONAME, 'unknown host'), PERMANENT),
+    (ValueError('unexpected'), PERMANENT),
+    (ZtpError('no prompt', RETRY_LATER), RETRY_LATER),
+])
+def test_classify_ztp_failure(error, expected):
+    assert classify_ztp_failure(error) == expected
+
+
+def test_classify_ztp_failure_paramiko():
+    paramiko = pytest.importorskip('paramiko')
+    ssh_exception = paramiko.ssh_exception
+
+    assert classify_ztp_failure(ssh_exception.AuthenticationException('denied')) == PERMANENT
+    assert classify_ztp_failure(ssh_exception.SSHException('Error reading SSH protocol banner')) == RETRY_SOON
+
+    # Une adresse injoignable et une qui refuse: le switch démarre, réessayer vite
+    errors = {('10.0.0.1', 22): OSError(errno.EHOSTUNREACH, 'no route to host'),
+              ('fe80::1', 22, 0, 0): ConnectionRefusedError(errno.ECONNREFUSED, 'refused')}
+    assert classify_ztp_failure(ssh_exception.NoValidConnectionsError(errors)) == RETRY_SOON
+
+    errors = {('10.0.0.1', 22): OSError(errno.EHOSTUNREACH, 'no route to host')}
+    assert classify_ztp_failure(ssh_exception.NoValidConnectionsError(errors)) == RETRY_LATER
+
+
+class FakeChannel(object):
+    """Canal SSH scripté: chaque envoi libère la réponse suivante."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.pending = [self.replies.pop(0)] if self.replies else []
+        self.sent = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv_ready(self):
+        return bool(self.pending)
+
+    def recv(self, size):
+        return self.pending.pop(0).encode('utf-8')
+
+    def send(self, data):
+        self.sent.append(data)
+        if self.replies:
+            reply = self.replies.pop(0)
+            if reply:
+                self.pending.append(reply)
+
+
+class FakeParamiko(object):
+
+    class AutoAddPolicy(object):
+        pass
+
+    def __init__(self, channel):
+        channel_ = channel
+
+        class SSHClient(object):
+            def set_missing_host_key_policy(self, policy):
+                pass
+
+            def connect(self, **kwargs):
+                pass
+
+            def invoke_shell(self):
+                return channel_
+
+            def close(self):
+                pass
+
+        self.SSHClient = SSHClient
+
+
+@pytest.fixture
+def fast_channel_reads(monkeypatch):
+    monkeypatch.setattr(aoscx_ztp, 'READ_TIMEOUT', 0.03)
+    monkeypatch.setattr(aoscx_ztp, 'READ_WAIT_TIME', 0.01)
+
+
+def test_configure_ztp_device_sets_password(monkeypatch, fast_channel_reads):
+    channel = FakeChannel(['Enter new password:', 'Confirm new password:', 'switch# '])
+    monkeypatch.setattr(aoscx_ztp, '_paramiko', lambda: FakeParamiko(channel))
+
+    configure_ztp_device('sw1', 'admin', 'secret')
+    assert channel.sent == [b'secret\n', b'secret\n']
+
+
+def test_configure_ztp_device_without_shell_prompt(monkeypatch, fast_channel_reads):
+    channel = FakeChannel(['Enter new password:', 'Confirm new password:', ''])
+    monkeypatch.setattr(aoscx_ztp, '_paramiko', lambda: FakeParamiko(channel))
+
+    with pytest.raises(ZtpError) as excinfo:
+        configure_ztp_device('sw1', 'admin', 'secret')
+    assert excinfo.value.failure_class == RETRY_SOON
+    assert 'CLI prompt' in str(excinfo.value)
+
+
+def test_backoff_is_exponential_and_capped():
+    queue = ZtpRetryQueue(None, retry_soon_delay=10, retry_later_delay=60, max_delay=300, jitter=0)
+    assert [queue.backoff(RETRY_SOON, n) for n in (1, 2, 3, 4)] == [10, 20, 40, 80]
+    assert [queue.backoff(RETRY_LATER, n) for n in (1, 2, 3, 4)] == [60, 120, 240, 300]
+
+
+def test_backoff_jitter_shortens_delay_only():
+    queue = ZtpRetryQueue(None, retry_soon_delay=10, jitter=0.5)
+    delays = [queue.backoff(RETRY_SOON, 2) for _ in range(200)]
+    assert all(10 <= delay <= 20 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def scripted_attempt(outcomes, calls):
+    """Tentative qui consomme, par switch, une liste d'erreurs (None = succès)."""
+    def attempt(name):
+        calls.append(name)
+        error = outcomes[name].pop(0)
+        if error is not None:
+            raise error
+    return attempt
+
+
+def test_queue_retries_after_the_other_switches():
+    calls = []
+    outcomes = {
+        'sw1': [ZtpError('booting', RETRY_SOON), None],
+        'sw2': [None],
+        'sw3': [None],
+    }
+    queue = ZtpRetryQueue(scripted_attempt(outcomes, calls), workers=1,
+                          retry_soon_delay=0.05, jitter=0)
+    for name in ('sw1', 'sw2', 'sw3'):
+        queue.add(name, name)
+    results = queue.run()
+
+    # sw1 attend son délai pendant que sw2 et sw3 passent
+    assert calls == ['sw1', 'sw2', 'sw3', 'sw1']
+    assert results['sw1']['status'] == 'configured'
+    assert results['sw1']['attempts'] == 2
+    assert results['sw1']['history'][0]['failure_class'] == RETRY_SOON
+    assert 'failure_class' not in results['sw1']
+
+
+def test_queue_orders_retries_by_due_time():
+    calls = []
+    outcomes = {
+        'late': [ZtpError('unreachable', RETRY_LATER), None],
+        'soon': [ZtpError('booting', RETRY_SOON), None],
+    }
+    queue = ZtpRetryQueue(scripted_attempt(outcomes, calls), workers=1,
+                          retry_soon_delay=0.02, retry_later_delay=0.2, jitter=0)
+    queue.add('late', 'late')
+    queue.add('soon', 'soon')
+    queue.run()
+
+    assert calls == ['late', 'soon', 'soon', 'late']
+
+
+def test_queue_gives_up():
+    calls = []
+    outcomes = {
+        'auth': [ZtpError('password already set', PERMANENT)],
+        'down': [ZtpError('booting', RETRY_SOON)] * 3,
+        'slow': [ZtpError('unreachable', RETRY_LATER)] * 2,
+    }
+    queue = ZtpRetryQueue(scripted_attempt(outcomes, calls), workers=3, max_attempts=3,
+                          retry_soon_delay=0.01, retry_later_delay=60, deadline=1)
+    for name in outcomes:
+        queue.add(name, name)
+    start = time.time()
+    results = queue.run()
+
+    assert time.time() - start < 5
+    # Échec définitif: pas de nouvelle tentative
+    assert results['auth']['status'] == 'failed'
+    assert results['auth']['attempts'] == 1
+    # Nombre maximal de tentatives atteint
+    assert results['down']['status'] == 'failed'
+    assert results['down']['attempts'] == 3
+    assert len(results['down']['history']) == 3
+    # La prochaine tentative tomberait après l'échéance
+    assert results['slow']['status'] == 'failed'
+    assert results['slow']['attempts'] == 1
+    assert results['slow']['failure_class'] == RETRY_LATER
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import os
+
+import pytest
+
+from conftest import REPO_ROOT
+
+
+@pytest.fixture(scope='module')
+def stream_module():
+    # Chargé par chemin: le module importe ses module_utils via ansible.module_utils
+    path = os.path.join(REPO_ROOT, 'plugins', 'modules', 'aoscx_upload_firmware_stream.py')
+    spec = importlib.util.spec_from_file_location('aoscx_upload_firmware_stream', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeModule(object):
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs['msg'])
+
+
+class StatusSequence(object):
+    """Session dont firmware/status renvoie les réponses données, la dernière en boucle."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.reads = 0
+
+    def request(self, method, path):
+        self.reads += 1
+        return 200, self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+
+
+@pytest.fixture
+def wait(stream_module, monkeypatch):
+    monkeypatch.setattr(stream_module, 'STATUS_POLL_INTERVAL', 0.01)
+
+    def wait(session, previous, timeout=0.5):
+        return stream_module.wait_firmware_status(FakeModule(), session, timeout, previous)
+    return wait
+
+
+def test_status_changed_within_the_same_second(wait):
+    previous = {'status': 'failure', 'reason': 'bad image', 'date': 1700000000}
+    session = StatusSequence({'status': 'success', 'reason': '', 'date': 1700000000})
+    assert wait(session, previous)['status'] == 'success'
+    assert session.reads == 1
+
+
+def test_previous_result_is_not_taken_for_this_upload(wait):
+    previous = {'status': 'success', 'reason': '', 'date': 1700000000}
+    session = StatusSequence(previous, previous, {'status': 'success', 'reason': '', 'date': 1700000042})
+    assert wait(session, previous)['date'] == 1700000042
+    assert session.reads == 3
+
+
+def test_in_progress_state_clears_previous_result(wait):
+    previous = {'status': 'success', 'reason': '', 'date': 1700000000}
+    session = StatusSequence({'status': 'in_progress', 'date': 1700000000}, previous)
+    assert wait(session, previous) == previous
+    assert session.reads == 2
+
+
+def test_timeout_when_only_the_previous_result_is_seen(wait):
+    previous = {'status': 'success', 'reason': '', 'date': 1700000000}
+    with pytest.raises(AssertionError, match='Timeout'):
+        wait(StatusSequence(previous), previous, timeout=0.05)
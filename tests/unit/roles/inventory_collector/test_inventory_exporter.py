@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+openpyxl = pytest.importorskip('openpyxl')
+
+EXPORTER = os.path.join(REPO_ROOT, 'roles', 'inventory_collector', 'files', 'inventory_exporter.py')
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'inventory.json')
+
+HEADERS = ['Nom du Switch', 'Modèle', 'Numéro de Série', 'Version OS', 'Date de Collecte', 'Adresse IP']
+
+
+def export(input_file, output_file):
+    result = subprocess.run([sys.executable, EXPORTER, str(input_file), str(output_file)],
+                            capture_output=True, text=True, check=False)
+    assert result.returncode == 0, result.stderr
+    return openpyxl.load_workbook(str(output_file)).active
+
+
+@pytest.fixture(scope='module')
+def sheet(tmp_path_factory):
+    return export(FIXTURE, tmp_path_factory.mktemp('export') / 'inventaire.xlsx')
+
+
+def values(sheet, row):
+    return [cell.value for cell in sheet[row]][:len(HEADERS)]
+
+
+def test_header_row(sheet):
+    assert sheet.title == 'Inventaire Aruba'
+    assert values(sheet, 1) == HEADERS
+    for cell in sheet[1]:
+        assert cell.font.bold
+        assert cell.alignment.horizontal == 'center'
+        assert cell.fill.start_color.rgb == '00CCCCCC'
+    widths = [sheet.column_dimensions[letter].width for letter in 'ABCDEF']
+    assert widths == [25, 20, 25, 20, 20, 15]
+
+
+def test_data_row(sheet):
+    # Colonnes dans l'ordre du mapping, valeurs gardées en texte (pas de conversion en date)
+    assert values(sheet, 2) == ['SW-CORE-01', 'JL635A', 'SG12ABC001', '10.13.1000',
+                                '2025-01-01 12:00:00', 'sw-core-01']
+    assert all(cell.alignment.horizontal == 'left' for cell in sheet[2])
+    assert sheet.cell(row=2, column=1).fill.fill_type is None
+
+
+def test_failed_collection_is_highlighted(sheet):
+    failed = sheet[6]
+    assert failed[1].value == 'ÉCHEC DE COLLECTE'
+    assert failed[1].fill.start_color.rgb == '00FFCCCC'
+    assert failed[0].fill.fill_type is None
+
+
+def test_summary_rows(sheet):
+    assert [sheet.cell(row=row, column=1).value for row in (8, 9, 10, 12)] == [
+        'Total des équipements :', 'Collectes réussies :', 'Collectes échouées :', 'Généré le :']
+    assert [sheet.cell(row=row, column=2).value for row in (8, 9, 10)] == [5, 4, 1]
+
+
+def test_missing_keys(tmp_path):
+    data = [{'nom_switch': 'sw1', 'serial': 'SN1', 'adresse_ip': '10.0.0.1'},
+            {'nom_switch': 'sw2', 'serial': 'SN2', 'version_os': '10.13.1000', 'extra': 'ignoré'}]
+    input_file = tmp_path / 'inventory.json'
+    input_file.write_text(json.dumps(data), encoding='utf-8')
+
+    sheet = export(input_file, tmp_path / 'inventaire.xlsx')
+    # Colonnes présentes dans au moins un équipement, cellules vides sinon
+    assert [cell.value for cell in sheet[1]] == ['Nom du Switch', 'Numéro de Série', 'Version OS', 'Adresse IP']
+    assert [cell.value for cell in sheet[2]] == ['sw1', 'SN1', None, '10.0.0.1']
+    assert [cell.value for cell in sheet[3]] == ['sw2', 'SN2', '10.13.1000', None]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+VALIDATOR = os.path.join(REPO_ROOT, 'roles', 'inventory_collector', 'files', 'inventory_validator.py')
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'inventory.json')
+
+
+def run_validator(*args):
+    return subprocess.run([sys.executable, VALIDATOR, FIXTURE] + list(args),
+                          capture_output=True, text=True, check=False)
+
+
+@pytest.fixture(scope='module')
+def report():
+    result = run_validator()
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_summary(report):
+    assert report['summary'] == {
+        'total': 5,
+        'collected': 4,
+        'missing_data': 1,
+        'duplicate_serials': 1,
+        'duplicate_ips': 0,
+        'hostname_collisions': 0,
+        'unknown_models': 0,
+        'version_outliers': 1,
+    }
+
+
+def test_missing_data_keeps_full_record(report):
+    assert [device['inventaire_hote'] for device in report['missing_data']] == ['sw-acc-04']
+    assert report['missing_data'][0]['ansible_host'] == '10.0.1.4'
+
+
+def test_duplicate_serials_report_collected_value(report):
+    # Regroupés sans tenir compte de la casse, rapportés tels que collectés
+    assert report['duplicate_serials'] == {'SG12ABC101': ['sw-acc-01', 'sw-acc-02']}
+
+
+def test_version_outliers(report):
+    assert report['expected_versions'] == {'6300': '10.13.1000', '8325': '10.13.1000'}
+    assert report['version_outliers'] == [
+        {'host': 'sw-acc-03', 'model': '6300', 'version': '10.11.1005', 'expected': '10.13.1000'},
+    ]
+
+
+def test_output_file(tmp_path, report):
+    output = tmp_path / 'validation.json'
+    result = run_validator('--output', str(output))
+    assert result.returncode == 0, result.stderr
+    assert json.loads(output.read_text(encoding='utf-8')) == report
+
+
+def test_fail_on_exit_code():
+    assert run_validator('--fail-on', 'duplicate_ips', 'unknown_models').returncode == 0
+
+    result = run_validator('--fail-on', 'duplicate_ips', 'version_outliers')
+    assert result.returncode == 2
+    assert 'version_outliers' in result.stderr
+    # Le rapport est écrit même quand un contrôle bloque
+    assert json.loads(result.stdout)['summary']['version_outliers'] == 1